@@ -8,21 +8,91 @@ class Settings(BaseSettings):
     MONGO_USER: str = Field(default="adminRoot")
     MONGO_PASSWORD: str = Field(default="adminRoot100")
     MONGO_DB: str = Field(default="survey_db")
+    # Full connection string; overrides the host/port/credentials above when set
+    MONGO_URI: str = Field(default="")
     
     APP_HOST: str = Field(default="0.0.0.0")
     APP_PORT: int = Field(default=8000)
 
+    # Template cache used by the response submit/read path
+    TEMPLATE_CACHE_MAX_SIZE: int = Field(default=1024)
+    TEMPLATE_CACHE_TTL_SECONDS: float = Field(default=60.0)
+
+    # Filtered list totals are cached this long unless a write invalidates them first
+    COUNT_CACHE_TTL_SECONDS: float = Field(default=5.0)
+
+    # Create the indexes declared by the services on startup; in strict mode
+    # list queries that would need a collection scan raise UnindexedQueryError
+    ENSURE_INDEXES_ON_STARTUP: bool = Field(default=True)
+    STRICT_INDEX_MODE: bool = Field(default=False)
+
+    # Cache-Control sent with ETag'd template and website survey reads
+    CONDITIONAL_CACHE_CONTROL: str = Field(default="private, no-cache")
+
+    # Server-side cursor batch size and rows per chunk for response exports
+    EXPORT_BATCH_SIZE: int = Field(default=1000)
+    EXPORT_CHUNK_ROWS: int = Field(default=500)
+
+    # Write-behind ingestion: tag survey and custom response POSTs are queued, answered with 202
+    # and inserted in batches of up to INGESTION_BATCH_SIZE or every INGESTION_FLUSH_INTERVAL_SECONDS.
+    # A POST waits INGESTION_ENQUEUE_TIMEOUT_SECONDS for room in a full queue before returning 503
+    ASYNC_INGESTION: bool = Field(default=False)
+    INGESTION_QUEUE_SIZE: int = Field(default=10000)
+    INGESTION_BATCH_SIZE: int = Field(default=500)
+    INGESTION_FLUSH_INTERVAL_SECONDS: float = Field(default=0.05)
+    INGESTION_ENQUEUE_TIMEOUT_SECONDS: float = Field(default=0.5)
+
+    # Idempotency-Key records for create endpoints expire after this long; the most recent
+    # IDEMPOTENCY_CACHE_SIZE finished keys are also kept in memory
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=86400)
+    IDEMPOTENCY_CACHE_SIZE: int = Field(default=10000)
+
+    # Tag autocomplete serves from an in-memory index rebuilt from tag_counts at most this often
+    TAG_INDEX_REFRESH_SECONDS: float = Field(default=30.0)
+
+    # Request profiling: a PROFILING_SAMPLE_RATE fraction of requests, plus any request whose
+    # X-Debug-Profile header equals PROFILING_TOKEN, is profiled into a ring buffer of
+    # PROFILING_MAX_FILES speedscope files under PROFILING_DIR. The token also guards /debug/profiles
+    PROFILING_SAMPLE_RATE: float = Field(default=0.0)
+    PROFILING_TOKEN: str = Field(default="")
+    PROFILING_DIR: str = Field(default="profiles")
+    PROFILING_MAX_FILES: int = Field(default=50)
+    PROFILING_INTERVAL_SECONDS: float = Field(default=0.001)
+
+    # Interval of the background job repairing custom_survey_templates.response_count (0 disables it)
+    RESPONSE_COUNT_RECONCILE_INTERVAL_SECONDS: float = Field(default=900.0)
+
+    # Upload storage: "local" writes under UPLOAD_DIR, "s3" uses the AWS settings below
+    STORAGE_BACKEND: str = Field(default="local")
+    UPLOAD_DIR: str = Field(default="uploads")
+    # Largest single upload or multipart part; S3 single uploads are sent in UPLOAD_PART_SIZE parts
+    UPLOAD_MAX_BYTES: int = Field(default=100 * 1024 * 1024)
+    UPLOAD_PART_SIZE: int = Field(default=8 * 1024 * 1024)
+    # Unfinished multipart uploads are forgotten after this long
+    UPLOAD_SESSION_TTL_SECONDS: int = Field(default=86400)
+    # How often parts of multipart uploads older than the session TTL are removed from storage (0 disables)
+    UPLOAD_SWEEP_INTERVAL_SECONDS: float = Field(default=3600.0)
+
+    # Thumbnail/web variants of uploaded survey images are rendered in a process pool of this size
+    IMAGE_DERIVATIVES_ENABLED: bool = Field(default=True)
+    IMAGE_DERIVATIVE_WORKERS: int = Field(default=2)
+    # A running job not finished after this long is assumed abandoned and may be claimed again
+    IMAGE_DERIVATIVE_STALE_SECONDS: float = Field(default=600.0)
+
     # AWS S3 Configuration
     AWS_ACCESS_KEY_ID: str = Field(default="")
     AWS_SECRET_ACCESS_KEY: str = Field(default="")
     AWS_REGION: str = Field(default="us-east-1") # Example region, change as needed
     S3_BUCKET_NAME: str = Field(default="your-s3-bucket-name") # Replace with your S3 bucket name
+    S3_ENDPOINT_URL: str = Field(default="") # Set for S3-compatible stores such as MinIO
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
     
     def get_mongo_uri(self) -> str:
+        if self.MONGO_URI:
+            return self.MONGO_URI
         return f"mongodb://{self.MONGO_USER}:{self.MONGO_PASSWORD}@{self.MONGO_HOST}:{self.MONGO_PORT}/"
 
 settings = Settings()
\ No newline at end of file
@@ -1,5 +1,6 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from app.config import settings
+from app.database.monitoring import event_listeners
 
 class MongoDBConnection:
     _client = None
@@ -9,14 +10,14 @@ class MongoDBConnection:
     def connect(cls):
         if cls._client is None:
             mongo_uri = settings.get_mongo_uri()
-            cls._client = MongoClient(mongo_uri)
+            cls._client = AsyncMongoClient(mongo_uri, event_listeners=event_listeners())
             cls._db = cls._client[settings.MONGO_DB]
             print(f"Connected to MongoDB: {settings.MONGO_DB}")
 
     @classmethod
-    def close(cls):
+    async def close(cls):
         if cls._client:
-            cls._client.close()
+            await cls._client.close()
             cls._client = None
             cls._db = None
             print("MongoDB connection closed")
@@ -32,4 +33,4 @@ def get_db():
 
 def get_survey_collection():
     db = get_db()
-    return db["surveys"]
\ No newline at end of file
+    return db["surveys"]
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import sys
+from typing import Dict, List
+from pymongo import IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
+
+NAMESPACE_NOT_FOUND = 26
+
+class UnindexedQueryError(RuntimeError):
+    pass
+
+def indexed_services() -> list:
+    # Imported here because the services import this module for assert_indexed
+    from app.services import (
+        WebsiteSurveyService,
+        TagSurveyService,
+        CustomSurveyTemplateService,
+        CustomSurveyResponseService,
+        ResponseRollupService,
+        UploadService,
+        ImageDerivativeService,
+        IdempotencyService,
+        TagCountService,
+        SearchService,
+    )
+    return [
+        WebsiteSurveyService,
+        TagSurveyService,
+        CustomSurveyTemplateService,
+        CustomSurveyResponseService,
+        ResponseRollupService,
+        UploadService,
+        ImageDerivativeService,
+        IdempotencyService,
+        TagCountService,
+        SearchService,
+    ]
+
+def declared_indexes() -> Dict[str, List[IndexModel]]:
+    registry: Dict[str, List[IndexModel]] = {}
+    for service in indexed_services():
+        for collection_name, indexes in service.INDEXES.items():
+            registry.setdefault(collection_name, []).extend(indexes)
+    return registry
+
+async def index_report(db: AsyncDatabase) -> Dict[str, Dict[str, List[str]]]:
+    report = {}
+    for collection_name, indexes in declared_indexes().items():
+        try:
+            existing = {
+                index["name"]
+                async for index in await db[collection_name].list_indexes()
+            }
+        except OperationFailure as e:
+            if e.code != NAMESPACE_NOT_FOUND:
+                raise
+            existing = set()
+        declared = {index.document["name"] for index in indexes}
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "extra": sorted(existing - declared - {"_id_"}),
+        }
+    return report
+
+async def ensure_indexes(db: AsyncDatabase) -> Dict[str, Dict[str, List[str]]]:
+    report = await index_report(db)
+    for collection_name, indexes in declared_indexes().items():
+        missing = set(report[collection_name]["missing"])
+        to_create = [index for index in indexes if index.document["name"] in missing]
+        if to_create:
+            await db[collection_name].create_indexes(to_create)
+            print(f"Created indexes on {collection_name}: {', '.join(sorted(missing))}")
+        if report[collection_name]["extra"]:
+            print(f"Undeclared indexes on {collection_name}: {', '.join(report[collection_name]['extra'])}")
+    return await index_report(db)
+
+def _has_collection_scan(plan: dict) -> bool:
+    if plan.get("stage") == "COLLSCAN":
+        return True
+    children = list(plan.get("inputStages", []))
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            children.append(plan[key])
+    return any(_has_collection_scan(child) for child in children)
+
+def assert_indexed(explanation: dict, collection_name: str, query: dict):
+    planner = explanation.get("queryPlanner", {})
+    if _has_collection_scan(planner.get("winningPlan", {})):
+        raise UnindexedQueryError(f"Query on {collection_name} runs a collection scan: {query}")
+
+async def main(check_only: bool) -> int:
+    from app.database.connection import MongoDBConnection
+    db = MongoDBConnection.get_database()
+    try:
+        report = await index_report(db) if check_only else await ensure_indexes(db)
+    finally:
+        await MongoDBConnection.close()
+    for collection_name, status in report.items():
+        print(f"{collection_name}: missing={status['missing']} extra={status['extra']}")
+    return 1 if check_only and any(status["missing"] for status in report.values()) else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or check the declared MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="Only report missing/extra indexes; exit 1 if any are missing")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check)))
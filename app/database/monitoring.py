@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+from typing import Dict, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+# Route template of the request being served, set by app.routes.metrics.track_route
+current_route: ContextVar[str] = ContextVar("current_route", default="none")
+
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round trip time",
+    ["command", "collection", "route"],
+    buckets=MONGO_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ["command", "collection", "route"],
+)
+MONGO_CHECKOUT_SECONDS = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=MONGO_BUCKETS,
+)
+MONGO_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed",
+    ["reason"],
+)
+MONGO_CONNECTIONS_IN_USE = Gauge(
+    "mongodb_pool_connections_checked_out",
+    "Pooled connections currently checked out",
+)
+MONGO_CONNECTIONS_OPEN = Gauge(
+    "mongodb_pool_connections_open",
+    "Pooled connections currently open",
+)
+
+TAG_COUNT_FAILURES = Counter(
+    "tag_count_update_failures_total",
+    "tag_counts updates that failed after the survey write; run app.database.rebuild_tag_counts",
+    ["operation"],
+)
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        self._started: Dict[Tuple[object, int], Tuple[str, str]] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else ""
+        self._started[(event.connection_id, event.request_id)] = (collection, current_route.get())
+
+    def _finish(self, event) -> Tuple[str, str, str]:
+        collection, route = self._started.pop((event.connection_id, event.request_id), ("", current_route.get()))
+        return event.command_name, collection, route
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.labels(*self._finish(event)).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        MONGO_COMMAND_SECONDS.labels(*labels).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_CONNECTIONS_OPEN.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_CONNECTIONS_OPEN.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_CHECKOUT_SECONDS.observe(event.duration)
+        MONGO_CHECKOUT_FAILURES.labels(event.reason).inc()
+
+    def connection_checked_out(self, event):
+        MONGO_CHECKOUT_SECONDS.observe(event.duration)
+        MONGO_CONNECTIONS_IN_USE.inc()
+
+    def connection_checked_in(self, event):
+        MONGO_CONNECTIONS_IN_USE.dec()
+
+def event_listeners() -> list:
+    return [CommandMetricsListener(), PoolMetricsListener()]
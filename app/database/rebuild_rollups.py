@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+from typing import Optional
+from bson import ObjectId
+from app.database.connection import MongoDBConnection
+from app.services.rollup_service import ResponseRollupService
+
+async def main(template_id: Optional[str]):
+    service = ResponseRollupService(MongoDBConnection.get_database())
+    try:
+        if template_id:
+            template = await service.templates_collection.find_one({"_id": ObjectId(template_id)})
+            if not template:
+                print(f"Template with ID {template_id} not found")
+                return
+            rebuilt = {template_id: await service.rebuild(template)}
+        else:
+            rebuilt = await service.rebuild_all()
+    finally:
+        await MongoDBConnection.close()
+    for rebuilt_id, count in rebuilt.items():
+        print(f"Rebuilt rollups for template {rebuilt_id} from {count} responses")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute custom survey rollups from raw responses")
+    parser.add_argument("--template-id", help="Only rebuild this template (default: every template)")
+    args = parser.parse_args()
+    asyncio.run(main(args.template_id))
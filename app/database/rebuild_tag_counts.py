@@ -0,0 +1,14 @@
+import asyncio
+from app.database.connection import MongoDBConnection
+from app.services.tag_count_service import TagCountService
+
+async def main():
+    service = TagCountService(MongoDBConnection.get_database())
+    try:
+        rebuilt = await service.rebuild()
+    finally:
+        await MongoDBConnection.close()
+    print(f"Rebuilt tag_counts with {rebuilt} tags and categories")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -35,10 +35,17 @@ from app.models.custom_survey_template import (
 
 from app.models.custom_survey_response import (
     CustomSurveyResponseCreate,
+    CustomSurveyResponseBatchCreate,
+    CustomSurveyResponseLookup,
     CustomSurveyResponseDetail,
     CustomSurveyResponseUpdate,
 )
 
+from app.models.upload import (
+    MultipartUploadCreate,
+    DerivativeJobCreate,
+)
+
 __all__ = [
     "GeneralInfo",
     "Branding",
@@ -69,6 +76,11 @@ __all__ = [
     "CustomSurveyTemplateUpdate",
 
     "CustomSurveyResponseCreate",
+    "CustomSurveyResponseBatchCreate",
+    "CustomSurveyResponseLookup",
     "CustomSurveyResponseDetail",
     "CustomSurveyResponseUpdate",
+
+    "MultipartUploadCreate",
+    "DerivativeJobCreate",
 ]
\ No newline at end of file
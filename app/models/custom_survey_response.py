@@ -9,6 +9,12 @@ class CustomSurveyResponseCreate(BaseModel):
     submitted_by: Optional[str] = Field(None, description="User ID or email of submitter")
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata (IP, user agent, etc.)")
 
+class CustomSurveyResponseBatchCreate(BaseModel):
+    responses: List[CustomSurveyResponseCreate] = Field(..., min_length=1, max_length=1000, description="Responses to submit in one request")
+
+class CustomSurveyResponseLookup(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=100, description="Response IDs to fetch")
+
 class CustomSurveyResponseDetail(BaseModel):
     id: str = Field(..., alias="_id", description="Response ID")
     template_id: str = Field(..., description="Template/Schema ID")
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class MultipartUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255, description="Original file name")
+    content_type: Optional[str] = Field(None, description="MIME type; guessed from the file name when omitted")
+
+class DerivativeJobCreate(BaseModel):
+    path: str = Field(..., min_length=1, description="Path of an uploaded image")
+    survey_id: Optional[str] = Field(None, description="Website survey to record the derivatives on")
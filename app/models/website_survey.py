@@ -105,6 +105,7 @@ class SurveyResponse(BaseModel):
     faq: FAQ
     domain: Domain
     status: str = Field(default="pending", description="Survey status: pending, in_progress, completed, approved")
+    image_derivatives: List[dict] = Field(default_factory=list, description="Thumbnail and web variants of uploaded images, keyed by source path")
     created_at: datetime
     updated_at: datetime
 
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
 from typing import Optional
+from app.config import settings
 from app.database.connection import get_db
+from app.routes.idempotency import idempotent
+from app.routes.responses import MongoJSONResponse
 from app.models.custom_survey_response import (
     CustomSurveyResponseCreate,
+    CustomSurveyResponseBatchCreate,
+    CustomSurveyResponseLookup,
     CustomSurveyResponseUpdate,
     CustomSurveyResponseDetail
 )
+from app.services.count_cache import TotalMode
+from app.services.ingestion_queue import QueueFullError
 from app.services.custom_survey_response_service import CustomSurveyResponseService
+from app.services.idempotency_service import IdempotencyService
 
 router = APIRouter(
     prefix="/custom-survey-responses",
@@ -16,48 +24,101 @@ router = APIRouter(
 def get_response_service(db=Depends(get_db)) -> CustomSurveyResponseService:
     return CustomSurveyResponseService(db)
 
+def get_idempotency_service(db=Depends(get_db)) -> IdempotencyService:
+    return IdempotencyService(db)
+
 @router.post("/", status_code=201, response_model=dict)
 async def submit_response(
         response_data: CustomSurveyResponseCreate,
+        idempotency_key: Optional[str] = Header(None, max_length=255),
+        service: CustomSurveyResponseService = Depends(get_response_service),
+        idempotency: IdempotencyService = Depends(get_idempotency_service)
+):
+    async def create():
+        try:
+            if settings.ASYNC_INGESTION:
+                response_id = await service.enqueue_response(response_data)
+                return 202, {
+                    "message": "Response accepted",
+                    "response_id": response_id
+                }
+            response_id = await service.create_response(response_data)
+            if response_id is None:
+                raise RuntimeError("the response could not be saved")
+            return 201, {
+                "message": "Response submitted successfully",
+                "response_id": response_id
+            }
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error submitting response: {str(e)}")
+    return await idempotent(idempotency, "custom-survey-responses", idempotency_key, response_data.model_dump(mode="json"), create)
+
+@router.post("/batch", status_code=200, response_model=dict)
+async def submit_response_batch(
+        batch: CustomSurveyResponseBatchCreate,
         service: CustomSurveyResponseService = Depends(get_response_service)
 ):
     try:
-        response_id = service.create_response(response_data)
-        return {
-            "message": "Response submitted successfully",
-            "response_id": response_id
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        results = await service.create_responses(batch)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error submitting response: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error submitting responses: {str(e)}")
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "message": "Batch processed",
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+@router.post("/lookup", status_code=200, response_model=dict)
+async def lookup_responses(
+        lookup: CustomSurveyResponseLookup,
+        service: CustomSurveyResponseService = Depends(get_response_service)
+):
+    responses, missing = await service.get_responses_by_ids(lookup.ids)
+    return MongoJSONResponse({
+        "total": len(responses),
+        "responses": responses,
+        "missing": missing
+    })
 
 @router.get("/", status_code=200, response_model=dict)
 async def get_all_responses(
         template_id: Optional[str] = Query(None),
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+        total_mode: TotalMode = Query("estimate", alias="total", description="exact, estimate (cached/estimated) or none"),
         service: CustomSurveyResponseService = Depends(get_response_service)
 ):
-    responses = service.get_all_responses(template_id=template_id, skip=skip, limit=limit)
-    total = service.count_responses(template_id=template_id)
-    return {
+    try:
+        responses, next_cursor = await service.get_all_responses(template_id=template_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await service.count_responses(template_id=template_id, mode=total_mode)
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "template_id": template_id,
         "responses": responses
-    }
+    })
 
 @router.get("/{response_id}", response_model=dict)
 async def get_response_by_id(
         response_id: str,
         service: CustomSurveyResponseService = Depends(get_response_service)
 ):
-    response = service.get_response_by_id(response_id)
+    response = await service.get_response_by_id(response_id)
     if not response:
         raise HTTPException(status_code=404, detail=f"Response with ID {response_id} not found")
-    return response
+    return MongoJSONResponse(response)
 
 @router.put("/{response_id}", response_model=dict)
 async def update_response_by_id(
@@ -66,7 +127,7 @@ async def update_response_by_id(
         service: CustomSurveyResponseService = Depends(get_response_service)
 ):
     try:
-        success = service.update_response(response_id, response_data)
+        success = await service.update_response(response_id, response_data)
         if not success:
             raise HTTPException(status_code=404, detail=f"Response with ID {response_id} not found or no changes made")
         return {
@@ -83,7 +144,7 @@ async def delete_response_by_id(
         response_id: str,
         service: CustomSurveyResponseService = Depends(get_response_service)
 ):
-    success = service.delete_response(response_id)
+    success = await service.delete_response(response_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Response with ID {response_id} not found")
     return {
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
+from fastapi.responses import StreamingResponse
+from typing import Optional, Literal
 from app.models.custom_survey_template import (
     CustomSurveyTemplateCreate,
     CustomSurveyTemplateResponse,
     CustomSurveyTemplateUpdate
 )
+from app.services.count_cache import TotalMode
 from app.services.custom_survey_template_service import CustomSurveyTemplateService
+from app.services.custom_survey_response_service import CustomSurveyResponseService
+from app.services.template_cache import template_cache
 from app.database.connection import get_db
+from app.routes.conditional import make_etag, etag_matches, cache_headers, not_modified
+from app.routes.responses import MongoJSONResponse
 
 router = APIRouter(
     prefix="/custom-survey-template",
@@ -16,13 +22,21 @@ router = APIRouter(
 def get_template_service(db=Depends(get_db)) -> CustomSurveyTemplateService:
     return CustomSurveyTemplateService(db)
 
+def get_response_service(db=Depends(get_db)) -> CustomSurveyResponseService:
+    return CustomSurveyResponseService(db)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
 @router.post("/", status_code=201, response_model=dict)
 async def create_tag_survey_template(
         template_data: CustomSurveyTemplateCreate,
         service: CustomSurveyTemplateService = Depends(get_template_service)
 ):
     try:
-        template_id = service.create_template(template_data)
+        template_id = await service.create_template(template_data)
         return {
             "message": "Template was created successfully",
             "template_id": template_id
@@ -35,26 +49,86 @@ async def get_all_templates(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         is_active: Optional[bool] = Query(None),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+        total_mode: TotalMode = Query("estimate", alias="total", description="exact, estimate (cached/estimated) or none"),
         service: CustomSurveyTemplateService = Depends(get_template_service)
 ):
-    templates = service.get_all_templates(skip=skip, limit=limit, is_active=is_active)
-    total = service.count_templates(is_active=is_active)
-    return {
+    try:
+        templates, next_cursor = await service.get_all_templates(skip=skip, limit=limit, is_active=is_active, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await service.count_templates(is_active=is_active, mode=total_mode)
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "templates": templates
-    }
+    })
 
 @router.get("/{template_id}", response_model=dict)
 async def get_template_by_id(
         template_id: str,
+        if_none_match: Optional[str] = Header(None),
         service: CustomSurveyTemplateService = Depends(get_template_service)
 ):
-    template = service.get_template_by_id(template_id)
+    if if_none_match:
+        version = await service.get_template_version(template_id)
+        if version:
+            etag = make_etag(template_id, version.get("updated_at"), version.get("response_count", 0))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    template = await service.get_template_by_id(template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found")
+    etag = make_etag(template_id, template.get("updated_at"), template.get("response_count", 0))
+    return MongoJSONResponse(template, headers=cache_headers(etag))
+
+@router.get("/{template_id}/export")
+async def export_template_responses(
+        template_id: str,
+        export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+        service: CustomSurveyResponseService = Depends(get_response_service)
+):
+    try:
+        template = await template_cache.get(service.templates_collection, template_id)
+    except Exception:
+        template = None
+    if not template:
+        raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found")
+    return StreamingResponse(
+        service.export_responses(template, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{template_id}.{export_format}"'}
+    )
+
+@router.get("/{template_id}/analytics", response_model=dict)
+async def get_template_analytics(
+        template_id: str,
+        service: CustomSurveyResponseService = Depends(get_response_service)
+):
+    try:
+        template = await template_cache.get(service.templates_collection, template_id)
+    except Exception:
+        template = None
+    if not template:
+        raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found")
+    return await service.get_template_analytics(template)
+
+@router.get("/{template_id}/rollups", response_model=dict)
+async def get_template_rollups(
+        template_id: str,
+        day_from: Optional[str] = Query(None, description="First day to include (YYYY-MM-DD)"),
+        day_to: Optional[str] = Query(None, description="Last day to include (YYYY-MM-DD)"),
+        service: CustomSurveyResponseService = Depends(get_response_service)
+):
+    try:
+        template = await template_cache.get(service.templates_collection, template_id)
+    except Exception:
+        template = None
     if not template:
         raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found")
-    return template
+    return await service.rollups.get_rollups(template, day_from=day_from, day_to=day_to)
 
 @router.put("/{template_id}", response_model=dict)
 async def update_template(
@@ -62,7 +136,7 @@ async def update_template(
         template_data: CustomSurveyTemplateUpdate,
         service: CustomSurveyTemplateService = Depends(get_template_service)
 ):
-    success = service.update_template(template_id, template_data)
+    success = await service.update_template(template_id, template_data)
     if not success:
         raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found or no changes made")
     return {
@@ -75,7 +149,7 @@ async def delete_template(
         template_id: str,
         service: CustomSurveyTemplateService = Depends(get_template_service)
 ):
-    status = service.delete_template(template_id)
+    status = await service.delete_template(template_id)
     if not status:
         raise HTTPException(status_code=404, detail=f"Template with ID {template_id} not found")
     return {
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import orjson
+from fastapi import HTTPException
+from app.routes.responses import MongoJSONResponse
+from app.services.idempotency_service import IdempotencyService
+
+Handler = Callable[[], Awaitable[Tuple[int, Dict[str, Any]]]]
+
+def payload_fingerprint(payload: Any) -> str:
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+def replay(record: dict, fingerprint: str) -> MongoJSONResponse:
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different payload")
+    if record.get("status_code") is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress", headers={"Retry-After": "1"})
+    return MongoJSONResponse(record["body"], status_code=record["status_code"], headers={"Idempotent-Replayed": "true"})
+
+async def idempotent(
+        service: IdempotencyService,
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        handler: Handler
+) -> MongoJSONResponse:
+    if not key:
+        status_code, body = await handler()
+        return MongoJSONResponse(body, status_code=status_code)
+    fingerprint = payload_fingerprint(payload)
+    record = await service.lookup(scope, key)
+    if record is None:
+        record = await service.claim(scope, key, fingerprint)
+    if record is not None:
+        return replay(record, fingerprint)
+    try:
+        status_code, body = await handler()
+    except BaseException:
+        await service.release(scope, key)
+        raise
+    try:
+        await service.complete(scope, key, status_code, body)
+    except Exception as e:
+        # The write already happened: answer it, and free the key rather than leave it stuck in progress
+        print(f"Error completing idempotency key {key}: {e}")
+        await service.release(scope, key)
+    return MongoJSONResponse(body, status_code=status_code)
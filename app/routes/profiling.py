@@ -0,0 +1,110 @@
+import asyncio
+import hmac
+import random
+import re
+import time
+from pathlib import Path
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from app.config import settings
+
+PROFILE_HEADER = "x-debug-profile"
+PROFILE_NAME = re.compile(r"^(\d+)_([A-Z]+)_(\d+)ms_([A-Za-z0-9_.-]*)\.speedscope\.json$")
+UNSAFE_ROUTE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+def profiling_enabled() -> bool:
+    return settings.PROFILING_SAMPLE_RATE > 0 or bool(settings.PROFILING_TOKEN)
+
+def token_matches(value: Optional[str]) -> bool:
+    # compare_digest rejects non-ASCII str, so compare bytes
+    return (
+        bool(settings.PROFILING_TOKEN)
+        and value is not None
+        and hmac.compare_digest(value.encode("utf-8"), settings.PROFILING_TOKEN.encode("utf-8"))
+    )
+
+def write_profile(directory: Path, name: str, profile: str, max_files: int):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(profile, encoding="utf-8")
+    profiles = sorted(directory.glob("*.speedscope.json"))
+    for old in profiles[:-max_files]:
+        old.unlink(missing_ok=True)
+
+class ProfilingMiddleware:
+    # Only installed when profiling_enabled(); an unsampled request costs one random() call and a header scan
+    def __init__(self, app):
+        self.app = app
+        self.directory = Path(settings.PROFILING_DIR)
+
+    def _wanted(self, scope) -> bool:
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return True
+        if settings.PROFILING_TOKEN:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode("latin-1"):
+                    return token_matches(value.decode("latin-1"))
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        started = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            route = scope.get("route")
+            path = UNSAFE_ROUTE.sub("_", route.path if route is not None else "unmatched").strip("_")
+            duration_ms = round((time.time() - started) * 1000)
+            name = f"{int(started * 1000)}_{scope['method']}_{duration_ms}ms_{path}.speedscope.json"
+            try:
+                profile = await asyncio.to_thread(profiler.output, SpeedscopeRenderer())
+                await asyncio.to_thread(write_profile, self.directory, name, profile, settings.PROFILING_MAX_FILES)
+            except Exception as e:
+                print(f"Error saving request profile: {e}")
+
+def require_profiling_token(x_debug_profile: Optional[str] = Header(None)):
+    if not token_matches(x_debug_profile):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+router = APIRouter(
+    prefix="/debug/profiles",
+    tags=["Health"],
+    include_in_schema=False,
+    dependencies=[Depends(require_profiling_token)]
+)
+
+@router.get("/", response_model=dict)
+async def list_profiles():
+    directory = Path(settings.PROFILING_DIR)
+    profiles: List[dict] = []
+    if directory.is_dir():
+        for path in sorted(directory.glob("*.speedscope.json"), reverse=True):
+            match = PROFILE_NAME.match(path.name)
+            if not match:
+                continue
+            profiles.append({
+                "name": path.name,
+                "created_at": int(match.group(1)) / 1000,
+                "method": match.group(2),
+                "duration_ms": int(match.group(3)),
+                "route": match.group(4),
+                "size": path.stat().st_size,
+            })
+    return {
+        "total": len(profiles),
+        "profiles": profiles
+    }
+
+@router.get("/{name}")
+async def get_profile(name: str):
+    path = Path(settings.PROFILING_DIR) / name
+    if not PROFILE_NAME.match(name) or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+    return FileResponse(path, media_type="application/json")
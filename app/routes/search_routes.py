@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import Literal, Optional
+from app.database.connection import get_db
+from app.routes.responses import MongoJSONResponse
+from app.services.search_service import SearchService, SEARCH_SOURCES
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"]
+)
+
+def get_search_service(db=Depends(get_db)) -> SearchService:
+    return SearchService(db)
+
+@router.get("/", response_model=dict)
+async def search(
+        q: str = Query(..., min_length=1, max_length=200, description="Words to look for; quote phrases, prefix a word with - to exclude it"),
+        type: Literal["all", "tag", "website"] = Query("all", description="Restrict results to tag or website surveys"),
+        limit: int = Query(10, ge=1, le=50),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+        service: SearchService = Depends(get_search_service)
+):
+    sources = tuple(SEARCH_SOURCES) if type == "all" else (type,)
+    try:
+        results, next_cursor = await service.search(q, sources=sources, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MongoJSONResponse({
+        "query": q,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "results": results
+    })
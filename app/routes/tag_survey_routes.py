@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
+from typing import List, Optional
 from app.models.tag_survey import (
     TagSurveyCreate,
     TagSurveyResponse,
     TagSurveyUpdate
 )
+from app.config import settings
+from app.services.count_cache import TotalMode
+from app.services.ingestion_queue import QueueFullError
+from app.services.tag_count_service import TagKind
 from app.services.tag_survey_service import TagSurveyService
 from app.database.connection import get_db
+from app.routes.idempotency import idempotent
+from app.routes.responses import MongoJSONResponse
+from app.services.idempotency_service import IdempotencyService
 
 router = APIRouter(
     prefix="/tag-survey",
@@ -16,76 +23,123 @@ router = APIRouter(
 def get_tag_survey_service(db=Depends(get_db)) -> TagSurveyService:
     return TagSurveyService(db)
 
+def get_idempotency_service(db=Depends(get_db)) -> IdempotencyService:
+    return IdempotencyService(db)
+
 @router.post("/", status_code=201, response_model=dict)
 async def create_tag_survey(
         survey_data: TagSurveyCreate,
-        service: TagSurveyService = Depends(get_tag_survey_service)
+        idempotency_key: Optional[str] = Header(None, max_length=255),
+        service: TagSurveyService = Depends(get_tag_survey_service),
+        idempotency: IdempotencyService = Depends(get_idempotency_service)
 ):
-    try:
-        survey_id = service.create_survey(survey_data)
-        return {
-            "message": "Tag Survey created successfully",
-            "survey_id": survey_id
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(f"Error creating survey: {str(e)}"))
+    async def create():
+        try:
+            if settings.ASYNC_INGESTION:
+                survey_id = await service.enqueue_survey(survey_data)
+                return 202, {
+                    "message": "Tag Survey accepted",
+                    "survey_id": survey_id
+                }
+            survey_id = await service.create_survey(survey_data)
+            return 201, {
+                "message": "Tag Survey created successfully",
+                "survey_id": survey_id
+            }
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(f"Error creating survey: {str(e)}"))
+    return await idempotent(idempotency, "tag-survey", idempotency_key, survey_data.model_dump(mode="json"), create)
 
 @router.get("/", response_model=dict)
 async def get_all_tag_surveys(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+        total_mode: TotalMode = Query("estimate", alias="total", description="exact, estimate (cached/estimated) or none"),
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    surveys = service.get_all_surveys(skip=skip, limit=limit)
-    total = service.count_surveys()
-    return {
+    try:
+        surveys, next_cursor = await service.get_all_surveys(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await service.count_surveys(mode=total_mode)
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "surveys": surveys
-    }
+    })
+
+@router.get("/tags/suggest", response_model=dict)
+async def suggest_tags(
+        prefix: str = Query(..., min_length=1, max_length=100, description="Start of the tag being typed"),
+        kind: TagKind = Query("tag", description="tag (requested_tags) or category (tag_category)"),
+        limit: int = Query(10, ge=1, le=50),
+        service: TagSurveyService = Depends(get_tag_survey_service)
+):
+    suggestions = await service.suggest_tags(prefix, kind=kind, limit=limit)
+    return MongoJSONResponse({
+        "prefix": prefix,
+        "kind": kind,
+        "suggestions": suggestions
+    })
 
 @router.get("/status/{status}", response_model=dict)
 async def get_tag_survey_status(
         status: str,
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    surveys = service.get_survey_by_status(status=status, skip=skip, limit=limit)
-    return {
+    try:
+        surveys, next_cursor = await service.get_survey_by_status(status=status, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MongoJSONResponse({
         "status": status,
         "total": len(surveys),
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "surveys": surveys
-    }
+    })
 
 @router.get("/organizer/{organizer_email}", response_model=dict)
 async def get_survey_by_organizer(
         organizer_email: str,
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    surveys = service.get_survey_by_organizer(organizer_email=organizer_email, skip=skip, limit=limit)
-    return {
+    try:
+        surveys, next_cursor = await service.get_survey_by_organizer(
+            organizer_email=organizer_email, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MongoJSONResponse({
         "organizer_email": organizer_email,
         "total": len(surveys),
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "surveys": surveys
-    }
+    })
 
 @router.get("/{survey_id}", response_model=dict)
 async def get_survey_by_id(
         survey_id: str,
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    survey = service.get_survey_by_id(survey_id)
+    survey = await service.get_survey_by_id(survey_id)
     if not survey:
         raise HTTPException(status_code=404, detail=f"Tag survey with ID {survey_id} not found")
-    return survey
+    return MongoJSONResponse(survey)
 
 @router.put("/{survey_id}", response_model=dict)
 async def update_survey_by_id(
@@ -93,7 +147,7 @@ async def update_survey_by_id(
         survey_data: TagSurveyUpdate,
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    success = service.update_survey(survey_id, survey_data)
+    success = await service.update_survey(survey_id, survey_data)
     if not success:
         raise HTTPException(status_code=404, detail=f"Tag survey not found or no changes were made")
     return {
@@ -106,7 +160,7 @@ async def delete_survey_by_id(
         survey_id: str,
         service: TagSurveyService = Depends(get_tag_survey_service)
 ):
-    success = service.delete_survey(survey_id)
+    success = await service.delete_survey(survey_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Tag survey with ID {survey_id} not found")
     return {
@@ -0,0 +1,168 @@
+from fastapi import APIRouter, HTTPException, Query, Depends, Path, Request, Header
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from bson import ObjectId
+from app.config import settings
+from app.database.connection import get_db
+from app.models.upload import MultipartUploadCreate, DerivativeJobCreate
+from app.routes.responses import MongoJSONResponse
+from app.services.image_derivative_service import ImageDerivativeService
+from app.services.upload_service import UploadService, UploadTooLargeError
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["uploads"]
+)
+
+def get_upload_service(db=Depends(get_db)) -> UploadService:
+    return UploadService(db)
+
+def get_derivative_service(db=Depends(get_db)) -> ImageDerivativeService:
+    return ImageDerivativeService(db)
+
+def check_content_length(content_length: Optional[int]):
+    if content_length is not None and content_length > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.UPLOAD_MAX_BYTES} bytes")
+
+@router.post("/", status_code=201, response_model=dict)
+async def upload_file(
+        request: Request,
+        filename: str = Query(..., min_length=1, max_length=255, description="Original file name"),
+        content_type: Optional[str] = Header(None),
+        content_length: Optional[int] = Header(None),
+        service: UploadService = Depends(get_upload_service)
+):
+    # The raw request body is streamed to storage; send the file itself, not multipart/form-data
+    check_content_length(content_length)
+    try:
+        return await service.upload(filename, content_type, request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
+
+@router.post("/multipart", status_code=201, response_model=dict)
+async def create_multipart_upload(
+        upload: MultipartUploadCreate,
+        service: UploadService = Depends(get_upload_service)
+):
+    try:
+        return await service.create_multipart(upload.filename, upload.content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating upload: {str(e)}")
+
+@router.get("/multipart/{upload_id}", response_model=dict)
+async def get_multipart_upload(
+        upload_id: str,
+        service: UploadService = Depends(get_upload_service)
+):
+    upload = await service.get_multipart(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail=f"Upload with ID {upload_id} not found")
+    return upload
+
+@router.put("/multipart/{upload_id}/parts/{part_number}", response_model=dict)
+async def upload_part(
+        request: Request,
+        upload_id: str,
+        part_number: int = Path(..., ge=1, le=10000),
+        content_length: Optional[int] = Header(None),
+        service: UploadService = Depends(get_upload_service)
+):
+    # Parts other than the last must be at least 5 MiB when the S3 backend is used
+    check_content_length(content_length)
+    try:
+        part = await service.upload_part(upload_id, part_number, request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading part: {str(e)}")
+    if not part:
+        raise HTTPException(status_code=404, detail=f"Upload with ID {upload_id} not found")
+    return part
+
+@router.post("/multipart/{upload_id}/complete", status_code=201, response_model=dict)
+async def complete_multipart_upload(
+        upload_id: str,
+        service: UploadService = Depends(get_upload_service)
+):
+    try:
+        upload = await service.complete_multipart(upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error completing upload: {str(e)}")
+    if not upload:
+        raise HTTPException(status_code=404, detail=f"Upload with ID {upload_id} not found")
+    return upload
+
+@router.delete("/multipart/{upload_id}", response_model=dict)
+async def abort_multipart_upload(
+        upload_id: str,
+        service: UploadService = Depends(get_upload_service)
+):
+    if not await service.abort_multipart(upload_id):
+        raise HTTPException(status_code=404, detail=f"Upload with ID {upload_id} not found")
+    return {"message": "Upload aborted successfully"}
+
+@router.get("/files/{key:path}")
+async def download_file(
+        key: str,
+        service: UploadService = Depends(get_upload_service)
+):
+    try:
+        upload = await service.open(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not upload:
+        raise HTTPException(status_code=404, detail=f"File {key} not found")
+    return StreamingResponse(
+        upload["chunks"],
+        media_type=upload["content_type"],
+        headers={"Content-Length": str(upload["size"])}
+    )
+
+@router.post("/derivatives", status_code=202, response_model=dict)
+async def create_derivative_job(
+        job: DerivativeJobCreate,
+        service: ImageDerivativeService = Depends(get_derivative_service),
+        upload_service: UploadService = Depends(get_upload_service)
+):
+    if job.survey_id and not ObjectId.is_valid(job.survey_id):
+        raise HTTPException(status_code=400, detail=f"Invalid survey ID {job.survey_id}")
+    try:
+        size = await upload_service.storage.size(job.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if size is None:
+        raise HTTPException(status_code=404, detail=f"File {job.path} not found")
+    job_id = await service.enqueue(job.path, job.survey_id)
+    return {
+        "message": "Derivative job queued",
+        "job_id": job_id
+    }
+
+@router.get("/derivatives", response_model=dict)
+async def list_derivative_jobs(
+        survey_id: str = Query(..., description="Website survey ID"),
+        service: ImageDerivativeService = Depends(get_derivative_service)
+):
+    jobs = await service.list_jobs(survey_id)
+    return MongoJSONResponse({
+        "total": len(jobs),
+        "jobs": jobs
+    })
+
+@router.get("/derivatives/{job_id}", response_model=dict)
+async def get_derivative_job(
+        job_id: str,
+        service: ImageDerivativeService = Depends(get_derivative_service)
+):
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return MongoJSONResponse(job)
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
+from typing import List, Optional, Literal
 from app.models.website_survey import (
     SurveyCreate,
     SurveyUpdate,
     SurveyResponse
 )
+from app.services.count_cache import TotalMode
 from app.services.website_survey_service import WebsiteSurveyService
 from app.database.connection import get_db
+from app.routes.conditional import make_etag, etag_matches, cache_headers, not_modified
+from app.routes.idempotency import idempotent
+from app.routes.responses import MongoJSONResponse
+from app.services.idempotency_service import IdempotencyService
 
 router = APIRouter(
     prefix="/website-survey",
@@ -16,45 +21,76 @@ router = APIRouter(
 def get_website_survey_service(db=Depends(get_db)) -> WebsiteSurveyService:
     return WebsiteSurveyService(db)
 
+def get_idempotency_service(db=Depends(get_db)) -> IdempotencyService:
+    return IdempotencyService(db)
+
 
 # list submmision
 @router.get("/", response_model=dict)
 async def list_submissions(
         skip: int = Query(0, ge=0, description="Number of records to skip"),
         limit: int = Query(10, ge=1,le=100, description="Maximum number of records to return"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+        total_mode: TotalMode = Query("estimate", alias="total", description="exact, estimate (cached/estimated) or none"),
+        fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. general_info.organization_name,status"),
+        view: Literal["summary", "full"] = Query("summary", description="Default field set when fields is not given"),
         survey_service: WebsiteSurveyService = Depends(get_website_survey_service)
 ):
     #docstring
-   surveys = survey_service.list_submissions(skip=skip, limit=limit)
-   total = survey_service.count()
-   return {
+   try:
+       surveys, next_cursor = await survey_service.list_submissions(
+           skip=skip, limit=limit, cursor=cursor, fields=fields, view=view
+       )
+   except ValueError as e:
+       raise HTTPException(status_code=400, detail=str(e))
+   total = await survey_service.count(mode=total_mode)
+   return MongoJSONResponse({
        "total": total,
        "skip": skip,
        "limit": limit,
+       "next_cursor": next_cursor,
        "surveys": surveys
-   }
+   })
 
 
 @router.post("/", status_code=201, response_model=dict)
 async def submit(
         survey_data: SurveyCreate,
-        service: WebsiteSurveyService = Depends(get_website_survey_service)
+        idempotency_key: Optional[str] = Header(None, max_length=255),
+        service: WebsiteSurveyService = Depends(get_website_survey_service),
+        idempotency: IdempotencyService = Depends(get_idempotency_service)
 ):
-    try:
-        survey_id = service.submit(survey_data)
-        return {
-            "message": "Website Survey Created successfully",
-            "survey_id": survey_id
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating survey: {str(e)}")
+    async def create():
+        try:
+            survey_id = await service.submit(survey_data)
+            return 201, {
+                "message": "Website Survey Created successfully",
+                "survey_id": survey_id
+            }
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error creating survey: {str(e)}")
+    return await idempotent(idempotency, "website-survey", idempotency_key, survey_data.model_dump(mode="json"), create)
 
 @router.get("/{survey_id}", response_model=dict)
 async def get_by_id(
         survey_id: str,
+        fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. general_info,branding.theme_mode"),
+        if_none_match: Optional[str] = Header(None),
         service: WebsiteSurveyService = Depends(get_website_survey_service)
 ):
-    survey = service.get_by_id(survey_id)
+    if if_none_match:
+        version = await service.get_version(survey_id)
+        if version:
+            etag = make_etag(survey_id, version.get("updated_at"), fields)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    try:
+        survey = await service.get_by_id(survey_id, fields=f"{fields},updated_at" if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not survey:
         raise HTTPException(status_code=404, detail=f"Survey with ID {survey_id} not found")
-    return survey
\ No newline at end of file
+    etag = make_etag(survey_id, survey.get("updated_at"), fields)
+    if fields and "updated_at" not in {field.strip() for field in fields.split(",")}:
+        survey.pop("updated_at", None)
+    return MongoJSONResponse(survey, headers=cache_headers(etag))
\ No newline at end of file
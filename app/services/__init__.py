@@ -2,10 +2,22 @@ from app.services.website_survey_service import WebsiteSurveyService
 from app.services.tag_survey_service import TagSurveyService
 from app.services.custom_survey_template_service import CustomSurveyTemplateService
 from app.services.custom_survey_response_service import CustomSurveyResponseService
+from app.services.rollup_service import ResponseRollupService
+from app.services.upload_service import UploadService
+from app.services.image_derivative_service import ImageDerivativeService
+from app.services.idempotency_service import IdempotencyService
+from app.services.tag_count_service import TagCountService
+from app.services.search_service import SearchService
 
 __all__ = [
     "WebsiteSurveyService",
     "TagSurveyService",
     "CustomSurveyTemplateService",
     "CustomSurveyResponseService",
+    "ResponseRollupService",
+    "UploadService",
+    "ImageDerivativeService",
+    "IdempotencyService",
+    "TagCountService",
+    "SearchService",
 ]
\ No newline at end of file
@@ -0,0 +1,49 @@
+import time
+from typing import Any, Dict, Literal, Optional, Tuple
+from bson import json_util
+from pymongo.asynchronous.collection import AsyncCollection
+from app.config import settings
+
+TotalMode = Literal["exact", "estimate", "none"]
+
+class CountCache:
+    def __init__(self, ttl_seconds: float, max_size: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+    def get(self, collection_name: str, filter_criteria: Dict[str, Any]) -> Optional[int]:
+        key = (collection_name, json_util.dumps(filter_criteria, sort_keys=True))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, collection_name: str, filter_criteria: Dict[str, Any], value: int):
+        if len(self._entries) >= self.max_size:
+            self._entries.clear()
+        key = (collection_name, json_util.dumps(filter_criteria, sort_keys=True))
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def invalidate(self, collection_name: str):
+        for key in [key for key in self._entries if key[0] == collection_name]:
+            del self._entries[key]
+
+count_cache = CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS)
+
+async def count_total(collection: AsyncCollection, filter_criteria: Dict[str, Any], mode: TotalMode = "estimate") -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "exact":
+        return await collection.count_documents(filter_criteria)
+    if not filter_criteria:
+        return await collection.estimated_document_count()
+    cached = count_cache.get(collection.name, filter_criteria)
+    if cached is not None:
+        return cached
+    value = await collection.count_documents(filter_criteria)
+    count_cache.put(collection.name, filter_criteria, value)
+    return value
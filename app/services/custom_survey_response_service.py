@@ -1,99 +1,77 @@
-from pymongo.database import Database
+import asyncio
+import csv
+import io
+import json
+from collections import Counter
+from pymongo import UpdateOne, IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
+from app.config import settings
 from app.models.custom_survey_response import (
     CustomSurveyResponseCreate,
+    CustomSurveyResponseBatchCreate,
     CustomSurveyResponseDetail,
     CustomSurveyResponseUpdate
 )
+from app.services.count_cache import TotalMode, count_cache, count_total
+from app.services.ingestion_queue import enqueue, insert_batch
+from app.services.pagination import paginate
+from app.services.response_validator import get_validator
+from app.services.rollup_service import ResponseRollupService, rollup_day
+from app.services.template_cache import template_cache
+
+RESPONSE_SORT_KEYS = ("submitted_at", "_id")
+HISTOGRAM_BUCKETS = 10
 
 class CustomSurveyResponseService:
-    def __init__(self, db: Database):
+    INDEXES = {
+        "custom_survey_responses": [
+            IndexModel([("template_id", ASCENDING), ("submitted_at", ASCENDING), ("_id", ASCENDING)], name="template_id_submitted_at_id"),
+            IndexModel([("submitted_at", ASCENDING), ("_id", ASCENDING)], name="submitted_at_id"),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
         self.responses_collection = db["custom_survey_responses"]
         self.templates_collection = db["custom_survey_templates"]
+        self.rollups = ResponseRollupService(db)
 
 
     def _validate_response(self, template: dict, responses: Dict[str, Any]) -> tuple[bool, Optional[str]]:
-        schema = template.get("schema", [])
-        for field in schema:
-            field_id = field.get("field_id")
-            is_required = field.get("required", True)
-            if is_required and field_id not in responses:
-                return False, f"Required field '{field.get('title', field_id)}' is missing"
-        for field_id, value in responses.items():
-            field_def = next((f for f in schema if f.get("field_id") == field_id), None)
-            if not field_def:
-                return False, f"Unknown field '{field_id}' not in template schema"
-            field_type = field_def.get("type")
-            field_title = field_def.get("title", field_id)
-            if value is None and not field_def.get("required", True):
-                continue
-            if field_type == "STRING":
-                if not isinstance(value, str):
-                    return False, f"Field '{field_title}' must be a string"
-                validation = field_def.get("validation", {})
-                if validation:
-                    if "min_length" in validation and len(value) < validation["min_length"]:
-                        return False, f"Field '{field_title}' must be at least {validation['min_length']} characters"
-                    if "max_length" in validation and len(value) > validation["max_length"]:
-                        return False, f"Field '{field_title}' must be at most {validation['max_length']} characters"
-            elif field_type == "TEXT":
-                if not isinstance(value, str):
-                    return False, f"Field '{field_title}' must be a string"
-                validation = field_def.get("validation", {})
-                if validation:
-                    if "min_length" in validation and len(value) < validation["min_length"]:
-                        return False, f"Field '{field_title}' must be at least {validation['min_length']} characters"
-                    if "max_length" in validation and len(value) > validation["max_length"]:
-                        return False, f"Field '{field_title}' must be at most {validation['max_length']} characters"
-            elif field_type == "NUMBER":
-                if not isinstance(value, (int, float)):
-                    return False, f"Field '{field_title}' must be a number"
-                validation = field_def.get("validation", {})
-                if validation:
-                    if "min_value" in validation and value < validation["min_value"]:
-                        return False, f"Field '{field_title}' must be at least {validation['min_value']}"
-                    if "max_value" in validation and value > validation["max_value"]:
-                        return False, f"Field '{field_title}' must be at most {validation['max_value']}"
-            elif field_type == "BOOLEAN":
-                if not isinstance(value, bool):
-                    return False, f"Field '{field_title}' must be a boolean (true/false)"
-            elif field_type == "DATE":
-                if not isinstance(value, str):
-                    return False, f"Field '{field_title}' must be a date string (YYYY-MM-DD)"
-            elif field_type == "EMAIL":
-                if not isinstance(value, str):
-                    return False, f"Field '{field_title}' must be a string"
-                if "@" not in value or "." not in value:
-                    return False, f"Field '{field_title}' must be a valid email address"
-            elif field_type == "OPTION":
-                options = field_def.get("options", [])
-                if value not in options:
-                    return False, f"Field '{field_title}' must be one of: {', '.join(options)}"
-            elif field_type == "FILE":
-                if not isinstance(value, str):
-                    return False, f"Field '{field_title}' must be a file path string"
-        return True, None
-
-    def create_response(self, response_data: CustomSurveyResponseCreate) -> Optional[str]:
+        return get_validator(template).validate(responses)
+
+    async def _prepare_response(self, response_data: CustomSurveyResponseCreate) -> Tuple[dict, dict]:
+        template = await template_cache.get(self.templates_collection, response_data.template_id)
+        if not template:
+            raise ValueError(f"Template with ID {response_data.template_id} not found")
+        is_valid, error_message = self._validate_response(template, response_data.responses)
+        if not is_valid:
+            raise ValueError(error_message)
+        response_dict = response_data.model_dump()
+        response_dict["template_name"] = template.get("name")
+        response_dict["submitted_at"] = datetime.utcnow()
+        return template, response_dict
+
+    async def create_response(self, response_data: CustomSurveyResponseCreate) -> Optional[str]:
         try:
-            template = self.templates_collection.find_one({
-                "_id": ObjectId(response_data.template_id)
-            })
-            if not template:
-                raise ValueError(f"Template with ID {response_data.template_id} not found")
-            is_valid, error_message = self._validate_response(template, response_data.responses)
-            if not is_valid:
-                raise ValueError(error_message)
-            response_dict = response_data.model_dump()
-            response_dict["template_name"] = template.get("name")
-            response_dict["submitted_at"] = datetime.utcnow()
-            result = self.responses_collection.insert_one(response_dict)
-            self.templates_collection.update_one(
-                {"_id": ObjectId(response_data.template_id)},
-                {"$inc": {"response_count": 1}}
+            template, response_dict = await self._prepare_response(response_data)
+            result = await self.responses_collection.insert_one(response_dict)
+            count_cache.invalidate(self.responses_collection.name)
+            # Only counted once the response exists, so a failed insert has nothing to undo
+            counters, rollups = await asyncio.gather(
+                self.templates_collection.update_one(
+                    {"_id": ObjectId(response_data.template_id)},
+                    {"$inc": {"response_count": 1}}
+                ),
+                self.rollups.record(template, response_data.responses, response_dict["submitted_at"]),
+                return_exceptions=True
             )
+            if isinstance(counters, Exception):
+                print(f"Error updating response counts: {counters}")
+            if isinstance(rollups, Exception):
+                print(f"Error updating response rollups (repair with python -m app.database.rebuild_rollups): {rollups}")
             return str(result.inserted_id)
         except ValueError:
             raise
@@ -101,71 +79,177 @@ class CustomSurveyResponseService:
             print(f"Error creating response: {e}")
             return None
 
-    def get_response_by_id(self, response_id: str) -> Optional[Dict[str, Any]]:
+    async def enqueue_response(self, response_data: CustomSurveyResponseCreate) -> str:
+        _, response_dict = await self._prepare_response(response_data)
+        response_dict["_id"] = ObjectId()
+        await enqueue(self.responses_collection.name, response_dict)
+        return str(response_dict["_id"])
+
+    async def create_responses(self, batch: CustomSurveyResponseBatchCreate) -> List[Dict[str, Any]]:
+        template_ids = list({item.template_id for item in batch.responses})
+        lookups = await asyncio.gather(
+            *(template_cache.get(self.templates_collection, template_id) for template_id in template_ids),
+            return_exceptions=True
+        )
+        templates = {
+            template_id: template
+            for template_id, template in zip(template_ids, lookups)
+            if isinstance(template, dict)
+        }
+        results: List[Dict[str, Any]] = []
+        documents = []
+        positions = []
+        submitted_at = datetime.utcnow()
+        for index, item in enumerate(batch.responses):
+            template = templates.get(item.template_id)
+            if not template:
+                results.append({"index": index, "success": False, "error": f"Template with ID {item.template_id} not found"})
+                continue
+            try:
+                is_valid, error_message = self._validate_response(template, item.responses)
+            except ValueError as e:
+                is_valid, error_message = False, str(e)
+            if not is_valid:
+                results.append({"index": index, "success": False, "error": error_message})
+                continue
+            response_dict = item.model_dump()
+            response_dict["template_name"] = template.get("name")
+            response_dict["submitted_at"] = submitted_at
+            results.append({"index": index, "success": True})
+            documents.append(response_dict)
+            positions.append(index)
+        if not documents:
+            return results
+        failed = await self.write_responses(documents, templates)
+        for position, (index, document) in enumerate(zip(positions, documents)):
+            if position in failed:
+                results[index] = {"index": index, "success": False, "error": failed[position]}
+                continue
+            results[index]["response_id"] = str(document["_id"])
+        return results
+
+    async def write_responses(self, documents: List[dict], templates: Optional[Dict[str, dict]] = None) -> Dict[int, str]:
+        if templates is None:
+            templates = await template_cache.get_many(
+                self.templates_collection,
+                {document["template_id"] for document in documents}
+            )
+        failed = await insert_batch(self.responses_collection, documents)
+        count_cache.invalidate(self.responses_collection.name)
+        inserted = Counter()
+        increments = self.rollups.new_increments()
+        for position, document in enumerate(documents):
+            template = templates.get(document["template_id"])
+            if position in failed or template is None:
+                continue
+            inserted[document["template_id"]] += 1
+            self.rollups.add_increments(increments, template, document["responses"], rollup_day(document["submitted_at"]))
+        if inserted:
+            # The documents are written, so these must not raise: a retried flush would apply the
+            # $inc again. A lost counter update is repaired by the reconcile job, lost rollups by a rebuild
+            counters, rollups = await asyncio.gather(
+                self.templates_collection.bulk_write(
+                    [
+                        UpdateOne({"_id": ObjectId(template_id)}, {"$inc": {"response_count": count}})
+                        for template_id, count in inserted.items()
+                    ],
+                    ordered=False
+                ),
+                self.rollups.apply(increments),
+                return_exceptions=True
+            )
+            if isinstance(counters, Exception):
+                print(f"Error updating response counts: {counters}")
+            if isinstance(rollups, Exception):
+                print(f"Error updating response rollups (repair with python -m app.database.rebuild_rollups): {rollups}")
+        return failed
+
+    def _response_detail(self, response: dict, template: dict) -> Dict[str, Any]:
+        return {
+            "_id": str(response["_id"]),
+            "template_id": str(response["template_id"]),
+            "template_name": template.get("name", response.get("template_name")),
+            "survey_schema": template.get("survey_schema", []),
+            "responses": response.get("responses", {}),
+            "submitted_by": response.get("submitted_by"),
+            "submitted_at": response.get("submitted_at"),
+            "metadata": response.get("metadata", {}),
+        }
+
+    async def get_response_by_id(self, response_id: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.responses_collection.find_one(
+            response = await self.responses_collection.find_one(
                 {"_id": ObjectId(response_id)}
             )
             if not response:
                 return None
-            template = self.templates_collection.find_one(
-                {"_id": ObjectId(response["template_id"])}
-            )
+            template = await template_cache.get(self.templates_collection, response["template_id"])
             if not template:
                 print(f"Warning: Template {response['template_id']} not found for response {response_id}")
                 return None
-            response["_id"] = str(response["_id"])
-            response["template_id"] = str(response["template_id"])
-            result = {
-                "_id": response["_id"],
-                "template_id": response["template_id"],
-                "template_name": template.get("template_name"),
-                "schema": template.get("schema", []),
-                "responses": response.get("responses", {}),
-                "submitted_by": response.get("submitted_by"),
-                "submitted_at": response.get("submitted_at"),
-                "metadata": response.get("metadata", {}),
-            }
-            return result
+            return self._response_detail(response, template)
         except Exception as e:
             print(f"Error getting response: {e}")
             return None
 
-    def get_all_responses(self, template_id: Optional[str] = None, skip: int = 0, limit: int = 10) -> List[Dict]:
+    async def get_responses_by_ids(self, response_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        object_ids = list({ObjectId(response_id) for response_id in response_ids if ObjectId.is_valid(response_id)})
+        found = {}
+        if object_ids:
+            responses = await self.responses_collection.find({"_id": {"$in": object_ids}}).to_list(length=None)
+            found = {str(response["_id"]): response for response in responses}
+        templates = await template_cache.get_many(
+            self.templates_collection,
+            {str(response["template_id"]) for response in found.values()}
+        )
+        details = []
+        missing = []
+        for response_id in response_ids:
+            response = found.get(response_id)
+            template = templates.get(str(response["template_id"])) if response else None
+            if template is None:
+                missing.append(response_id)
+                continue
+            details.append(self._response_detail(response, template))
+        return details, missing
+
+    async def get_all_responses(self, template_id: Optional[str] = None, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
         filter_criteria = {}
         if template_id:
             filter_criteria["template_id"] = template_id
-        responses = list(
-            self.responses_collection.find(filter_criteria)
-            .skip(skip)
-            .limit(limit)
+        return await paginate(
+            self.responses_collection, filter_criteria, limit, cursor=cursor, skip=skip, sort_keys=RESPONSE_SORT_KEYS
         )
-        for response in responses:
-            response["_id"] = str(response["_id"])
-        return responses
 
-    def update_response(self, response_id: str, response_data: CustomSurveyResponseUpdate) -> bool:
+    async def update_response(self, response_id: str, response_data: CustomSurveyResponseUpdate) -> bool:
         try:
             update_dict = response_data.model_dump(exclude_unset=True)
             if not update_dict:
                 return False
+            existing_response = None
+            template = None
             if "responses" in update_dict:
-                existing_response = self.responses_collection.find_one({
+                existing_response = await self.responses_collection.find_one({
                     "_id": ObjectId(response_id)
                 })
                 if not existing_response:
                     return False
-                template = self.templates_collection.find_one({
-                    "_id": ObjectId(existing_response["template_id"])
-                })
+                template = await template_cache.get(self.templates_collection, existing_response["template_id"])
                 if template:
                     is_valid, error_message = self._validate_response(template, update_dict["responses"])
                     if not is_valid:
                         raise ValueError(error_message)
-            result = self.responses_collection.update_one(
+            result = await self.responses_collection.update_one(
                 {"_id": ObjectId(response_id)},
                 {"$set": update_dict}
             )
+            if result.modified_count > 0 and template:
+                await self.rollups.record_change(
+                    template,
+                    existing_response.get("responses") or {},
+                    update_dict["responses"] or {},
+                    existing_response.get("submitted_at")
+                )
             return result.modified_count > 0
         except ValueError:
             raise
@@ -173,18 +257,167 @@ class CustomSurveyResponseService:
             print(f"Error updating response: {e}")
             return False
 
-    def delete_response(self, response_id: str) -> bool:
+    async def delete_response(self, response_id: str) -> bool:
         try:
-            result = self.responses_collection.delete_one({
-                "_id": ObjectId(response_id)
-            })
-            return result.deleted_count > 0
+            deleted = await self.responses_collection.find_one_and_delete(
+                {"_id": ObjectId(response_id)},
+                projection={"template_id": 1, "responses": 1, "submitted_at": 1}
+            )
+            if not deleted:
+                return False
+            count_cache.invalidate(self.responses_collection.name)
+            if ObjectId.is_valid(deleted.get("template_id")):
+                await self.templates_collection.update_one(
+                    {"_id": ObjectId(deleted["template_id"])},
+                    {"$inc": {"response_count": -1}}
+                )
+                template = await template_cache.get(self.templates_collection, deleted["template_id"])
+                if template:
+                    await self.rollups.record(template, deleted.get("responses") or {}, deleted.get("submitted_at"), sign=-1)
+            return True
         except Exception as e:
             print(f"Error deleting response: {e}")
             return False
 
-    def count_responses(self, template_id: Optional[str] = None) -> int:
+    async def count_responses(self, template_id: Optional[str] = None, mode: TotalMode = "estimate") -> Optional[int]:
         filter_criteria = {}
         if template_id:
             filter_criteria["template_id"] = template_id
-        return self.responses_collection.count_documents(filter_criteria)
\ No newline at end of file
+        return await count_total(self.responses_collection, filter_criteria, mode)
+
+    def _export_value(self, value: Any) -> Any:
+        if value is None:
+            return ""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, default=str)
+        return value
+
+    async def export_responses(self, template: dict, export_format: str = "csv") -> AsyncIterator[str]:
+        field_ids = [field.get("field_id") for field in template.get("survey_schema", [])]
+        cursor = self.responses_collection.find(
+            {"template_id": str(template["_id"])},
+            {"responses": 1, "submitted_by": 1, "submitted_at": 1},
+            batch_size=settings.EXPORT_BATCH_SIZE
+        ).sort([(key, 1) for key in RESPONSE_SORT_KEYS])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(["response_id", "submitted_at", "submitted_by", *field_ids])
+        rows = 0
+        try:
+            async for response in cursor:
+                answers = response.get("responses") or {}
+                submitted_at = response.get("submitted_at")
+                submitted_at = submitted_at.isoformat() if submitted_at else None
+                if export_format == "csv":
+                    writer.writerow([
+                        str(response["_id"]),
+                        submitted_at or "",
+                        response.get("submitted_by") or "",
+                        *(self._export_value(answers.get(field_id)) for field_id in field_ids)
+                    ])
+                else:
+                    row = {
+                        "response_id": str(response["_id"]),
+                        "submitted_at": submitted_at,
+                        "submitted_by": response.get("submitted_by"),
+                    }
+                    row.update((field_id, answers.get(field_id)) for field_id in field_ids)
+                    buffer.write(json.dumps(row, default=str))
+                    buffer.write("\n")
+                rows += 1
+                if rows % settings.EXPORT_CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            await cursor.close()
+
+    def _analytics_facets(self, survey_schema: List[dict]) -> Tuple[Dict[str, list], Dict[str, Any]]:
+        facets: Dict[str, list] = {"total": [{"$count": "count"}]}
+        answered = {"_id": None}
+        for index, field in enumerate(survey_schema):
+            field_id = field.get("field_id") or ""
+            if not field_id or "." in field_id or field_id.startswith("$"):
+                continue
+            path = f"responses.{field_id}"
+            answered[f"f{index}"] = {"$sum": {"$cond": [{"$gt": [f"${path}", None]}, 1, 0]}}
+            field_type = field.get("type")
+            if field_type == "NUMBER":
+                numeric = {"$match": {path: {"$type": "number"}}}
+                facets[f"f{index}_stats"] = [
+                    numeric,
+                    {"$group": {"_id": None, "min": {"$min": f"${path}"}, "max": {"$max": f"${path}"}, "mean": {"$avg": f"${path}"}}},
+                ]
+                facets[f"f{index}_histogram"] = [
+                    numeric,
+                    {"$bucketAuto": {"groupBy": f"${path}", "buckets": HISTOGRAM_BUCKETS}},
+                ]
+            elif field_type in ("OPTION", "BOOLEAN"):
+                facets[f"f{index}_counts"] = [
+                    {"$match": {path: {"$ne": None}}},
+                    {"$group": {"_id": f"${path}", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ]
+            elif field_type == "DATE":
+                facets[f"f{index}_buckets"] = [
+                    {"$match": {path: {"$type": "string"}}},
+                    {"$group": {"_id": {"$substrCP": [f"${path}", 0, 7]}, "count": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}},
+                ]
+        facets["answered"] = [{"$group": answered}]
+        return facets, answered
+
+    async def get_template_analytics(self, template: dict) -> Dict[str, Any]:
+        survey_schema = template.get("survey_schema", [])
+        facets, answered_keys = self._analytics_facets(survey_schema)
+        pipeline = [
+            {"$match": {"template_id": str(template["_id"])}},
+            {"$facet": facets},
+        ]
+        results = await (await self.responses_collection.aggregate(pipeline)).to_list(length=1)
+        result = results[0] if results else {}
+        total = result["total"][0]["count"] if result.get("total") else 0
+        answered = result["answered"][0] if result.get("answered") else {}
+        fields = []
+        for index, field in enumerate(survey_schema):
+            key = f"f{index}"
+            if key not in answered_keys:
+                continue
+            field_answered = answered.get(key, 0)
+            summary = {
+                "field_id": field.get("field_id"),
+                "title": field.get("title"),
+                "type": field.get("type"),
+                "required": field.get("required", True),
+                "answered": field_answered,
+                "completion_rate": round(field_answered / total, 4) if total else 0.0,
+            }
+            if f"{key}_stats" in facets:
+                stats = result.get(f"{key}_stats") or [{}]
+                summary["min"] = stats[0].get("min")
+                summary["max"] = stats[0].get("max")
+                summary["mean"] = stats[0].get("mean")
+                summary["histogram"] = [
+                    {"min": bucket["_id"]["min"], "max": bucket["_id"]["max"], "count": bucket["count"]}
+                    for bucket in result.get(f"{key}_histogram", [])
+                ]
+            if f"{key}_counts" in facets:
+                summary["counts"] = [
+                    {"value": row["_id"], "count": row["count"]}
+                    for row in result.get(f"{key}_counts", [])
+                ]
+            if f"{key}_buckets" in facets:
+                summary["monthly"] = [
+                    {"month": row["_id"], "count": row["count"]}
+                    for row in result.get(f"{key}_buckets", [])
+                ]
+            fields.append(summary)
+        return {
+            "template_id": str(template["_id"]),
+            "template_name": template.get("name"),
+            "total_responses": total,
+            "fields": fields,
+        }
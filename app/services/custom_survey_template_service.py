@@ -1,79 +1,132 @@
+import asyncio
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from bson import ObjectId
-from pymongo.database import Database
+from pymongo import UpdateOne, IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
 from app.models import CustomSurveyTemplateCreate, CustomSurveyTemplateUpdate
+from app.services.count_cache import TotalMode, count_cache, count_total
+from app.services.pagination import paginate
+from app.services.template_cache import template_cache
 
 class CustomSurveyTemplateService:
-    def __init__(self, db: Database):
+    INDEXES = {
+        "custom_survey_templates": [
+            IndexModel([("is_active", ASCENDING), ("_id", ASCENDING)], name="is_active_id"),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
         self.templates_collection = db["custom_survey_templates"]
         self.responses_collection = db["custom_survey_responses"]
+        self.observed_drift: Dict[str, Tuple[int, int]] = {}
 
-    def create_template(self, template_data: CustomSurveyTemplateCreate) -> str:
+    async def create_template(self, template_data: CustomSurveyTemplateCreate) -> str:
         template_dict = template_data.model_dump()
         template_dict["created_at"] = datetime.utcnow()
         template_dict["updated_at"] = datetime.utcnow()
         template_dict["response_count"] = 0
-        result = self.templates_collection.insert_one(template_dict)
+        result = await self.templates_collection.insert_one(template_dict)
+        count_cache.invalidate(self.templates_collection.name)
         return str(result.inserted_id)
 
-    def get_template_by_id(self, template_id: str) -> Optional[dict]:
+    async def get_template_by_id(self, template_id: str) -> Optional[dict]:
         try:
-            template = self.templates_collection.find_one({"_id": ObjectId(template_id)})
+            template = await self.templates_collection.find_one({"_id": ObjectId(template_id)})
             if not template:
                 return None
             template["_id"] = str(template["_id"])
-            response_count = self.responses_collection.count_documents({
-                "template_id": str(template["_id"])
-            })
-            template["response_count"] = response_count
+            template.setdefault("response_count", 0)
             return template
         except Exception as e:
             print(f"Error getting template: {e}")
             return None
 
-    def get_all_templates(self, skip: int = 0, limit: int = 10, is_active: Optional[bool] = None) -> List[dict]:
+    async def get_template_version(self, template_id: str) -> Optional[dict]:
+        try:
+            return await self.templates_collection.find_one(
+                {"_id": ObjectId(template_id)},
+                {"updated_at": 1, "response_count": 1}
+            )
+        except Exception as e:
+            print(f"Error getting template version: {e}")
+            return None
+
+    async def get_all_templates(self, skip: int = 0, limit: int = 10, is_active: Optional[bool] = None, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
         filter_criteria = {}
         if is_active is not None:
             filter_criteria["is_active"] = is_active
-        templates = list(
-            self.templates_collection.find(filter_criteria)
-            .skip(skip)
-            .limit(limit)
-        )
-        for template in templates:
-            template["_id"] = str(template["_id"])
-            response_count = self.responses_collection.count_documents({
-                "template_id": str(template["_id"])
-            })
-            template["response_count"] = response_count
-        return templates
+        return await paginate(self.templates_collection, filter_criteria, limit, cursor=cursor, skip=skip)
 
-    def update_template(self, template_id:str, template_data: CustomSurveyTemplateUpdate) -> bool:
+    async def update_template(self, template_id:str, template_data: CustomSurveyTemplateUpdate) -> bool:
         try:
             update_dict = template_data.model_dump(exclude_unset=True)
             if not update_dict:
                 return False
             update_dict["updated_at"] = datetime.utcnow()
-            result = self.templates_collection.update_one(
+            result = await self.templates_collection.update_one(
                 {"_id": ObjectId(template_id)},
                 {"$set": update_dict}
             )
+            template_cache.invalidate(template_id)
+            count_cache.invalidate(self.templates_collection.name)
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating template: {e}")
             return False
 
-    def delete_template(self, template_id: str) -> bool:
+    async def delete_template(self, template_id: str) -> bool:
         try:
-            result = self.templates_collection.delete_one({"_id": ObjectId(template_id)})
+            result = await self.templates_collection.delete_one({"_id": ObjectId(template_id)})
+            template_cache.invalidate(template_id)
+            count_cache.invalidate(self.templates_collection.name)
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting template: {e}")
             return False
 
-    def count_templates(self, is_active: Optional[bool] = None) -> int:
+    async def count_templates(self, is_active: Optional[bool] = None, mode: TotalMode = "estimate") -> Optional[int]:
         filter_criteria = {}
         if is_active is not None:
             filter_criteria["is_active"] = is_active
-        return self.templates_collection.count_documents(filter_criteria)
\ No newline at end of file
+        return await count_total(self.templates_collection, filter_criteria, mode)
+
+    async def reconcile_response_counts(self, confirm: bool = True) -> int:
+        # Counters are read after the $group, so a create or delete landing in between looks like drift.
+        # With confirm, a counter is only repaired when the same (counter, actual) pair was seen on the
+        # previous run too, i.e. the template took no writes in between; the $set is conditional either way
+        actual_counts = {}
+        pipeline = [{"$group": {"_id": "$template_id", "count": {"$sum": 1}}}]
+        async for row in await self.responses_collection.aggregate(pipeline):
+            actual_counts[str(row["_id"])] = row["count"]
+        drift = {}
+        operations = []
+        async for template in self.templates_collection.find({}, {"response_count": 1}):
+            template_id = str(template["_id"])
+            observed = template.get("response_count")
+            actual = actual_counts.get(template_id, 0)
+            if observed == actual:
+                continue
+            drift[template_id] = (observed, actual)
+            if confirm and self.observed_drift.get(template_id) != (observed, actual):
+                continue
+            operations.append(UpdateOne(
+                {"_id": template["_id"], "response_count": observed},
+                {"$set": {"response_count": actual}}
+            ))
+        self.observed_drift = drift
+        if not operations:
+            return 0
+        result = await self.templates_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+async def run_response_count_reconciliation(db: AsyncDatabase, interval_seconds: float):
+    service = CustomSurveyTemplateService(db)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            repaired = await service.reconcile_response_counts()
+            if repaired:
+                print(f"Repaired response_count on {repaired} templates")
+        except Exception as e:
+            print(f"Error reconciling response counts: {e}")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pymongo import IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+
+class CompletedKeyCache:
+    # Per-process copy of finished keys so most retries never reach Mongo
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, record: dict):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+completed_keys = CompletedKeyCache(
+    max_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS
+)
+
+class IdempotencyService:
+    INDEXES = {
+        "idempotency_keys": [
+            IndexModel(
+                [("created_at", ASCENDING)],
+                name="created_at_ttl",
+                expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS
+            ),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
+        self.collection = db["idempotency_keys"]
+
+    async def lookup(self, scope: str, key: str) -> Optional[dict]:
+        record_id = f"{scope}:{key}"
+        record = completed_keys.get(record_id)
+        if record is not None:
+            return record
+        record = await self.collection.find_one({"_id": record_id})
+        if record and record.get("status_code") is not None:
+            completed_keys.put(record_id, record)
+        return record
+
+    async def claim(self, scope: str, key: str, fingerprint: str) -> Optional[dict]:
+        record_id = f"{scope}:{key}"
+        try:
+            await self.collection.insert_one({
+                "_id": record_id,
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "created_at": datetime.utcnow(),
+            })
+            return None
+        except DuplicateKeyError:
+            return await self.collection.find_one({"_id": record_id})
+
+    async def complete(self, scope: str, key: str, status_code: int, body: Dict[str, Any]):
+        record_id = f"{scope}:{key}"
+        record = await self.collection.find_one_and_update(
+            {"_id": record_id},
+            {"$set": {"status_code": status_code, "body": body}},
+            return_document=True
+        )
+        if record:
+            completed_keys.put(record_id, record)
+
+    async def release(self, scope: str, key: str):
+        try:
+            await self.collection.delete_one({"_id": f"{scope}:{key}", "status_code": None})
+        except Exception as e:
+            print(f"Error releasing idempotency key {key}: {e}")
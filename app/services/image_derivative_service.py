@@ -0,0 +1,209 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, UTC
+from pathlib import PurePosixPath
+from typing import Any, AsyncIterator, Dict, List, Optional
+from bson import ObjectId
+from PIL import Image, ImageOps
+from pymongo import IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+from app.services.storage import get_storage
+from app.services.upload_service import limit_size
+
+# name -> (longest edge in pixels, WebP quality), largest first so each variant is scaled from the previous one
+DERIVATIVES = {
+    "web": (1600, 82),
+    "thumbnail": (320, 70),
+}
+IMAGE_SOURCES = ("branding.organization_logo", "web_content.event_photos", "gallery")
+UPLOAD_URL_PREFIX = "/api/v1/uploads/files/"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_tasks: set = set()
+_slots: Optional[asyncio.Semaphore] = None
+
+def render_derivatives(data: bytes) -> Dict[str, Dict[str, Any]]:
+    # Runs in a worker process
+    with Image.open(io.BytesIO(data)) as source:
+        largest = max(edge for edge, _ in DERIVATIVES.values())
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        rendered = {}
+        for name, (edge, quality) in DERIVATIVES.items():
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", quality=quality, method=4)
+            rendered[name] = {"data": buffer.getvalue(), "width": image.width, "height": image.height}
+        return rendered
+
+def derivative_key(source: str, name: str) -> str:
+    path = PurePosixPath(source)
+    return str(path.with_name(f"{path.stem}.{name}.webp"))
+
+def image_paths(survey: dict) -> List[str]:
+    paths = []
+    def collect(value):
+        if isinstance(value, str):
+            path = value[len(UPLOAD_URL_PREFIX):] if value.startswith(UPLOAD_URL_PREFIX) else value
+            if path not in paths:
+                paths.append(path)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+    for source in IMAGE_SOURCES:
+        value = survey
+        for part in source.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        collect(value)
+    return paths
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS)
+    return _pool
+
+async def shutdown_derivatives():
+    global _pool, _slots
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+    _slots = None
+
+class ImageDerivativeService:
+    INDEXES = {
+        "image_jobs": [
+            IndexModel([("survey_id", ASCENDING), ("created_at", ASCENDING)], name="survey_id_created_at"),
+            IndexModel([("status", ASCENDING)], name="status"),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase, storage=None):
+        self.jobs_collection = db["image_jobs"]
+        self.uploads_collection = db["uploads"]
+        self.surveys_collection = db["website_building_surveys"]
+        self.storage = storage or get_storage()
+
+    def _schedule(self, job_id: ObjectId):
+        task = asyncio.create_task(self.run(job_id))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+    async def enqueue(self, source: str, survey_id: Optional[str] = None) -> str:
+        job = {
+            "source": source,
+            "survey_id": survey_id,
+            "status": "pending",
+            "derivatives": {},
+            "created_at": datetime.utcnow(),
+        }
+        result = await self.jobs_collection.insert_one(job)
+        self._schedule(result.inserted_id)
+        return str(result.inserted_id)
+
+    async def enqueue_for_survey(self, survey_id: str, survey: dict) -> List[str]:
+        paths = image_paths(survey)
+        if not paths:
+            return []
+        uploads = self.uploads_collection.find(
+            {"key": {"$in": paths}, "content_type": {"$regex": "^image/"}},
+            {"key": 1}
+        )
+        return [await self.enqueue(upload["key"], survey_id) async for upload in uploads]
+
+    def _claimable(self, now: datetime) -> dict:
+        # Pending jobs, or running ones whose worker has not finished within the stale timeout
+        stale = now - timedelta(seconds=settings.IMAGE_DERIVATIVE_STALE_SECONDS)
+        return {"$or": [{"status": "pending"}, {"status": "running", "started_at": {"$lt": stale}}]}
+
+    async def run(self, job_id: ObjectId):
+        global _slots
+        if _slots is None:
+            _slots = asyncio.Semaphore(settings.IMAGE_DERIVATIVE_WORKERS)
+        async with _slots:
+            started_at = datetime.utcnow()
+            job = await self.jobs_collection.find_one_and_update(
+                {"_id": job_id, **self._claimable(started_at)},
+                {"$set": {"status": "running", "started_at": started_at}}
+            )
+            if not job:
+                return
+            claim = {"_id": job_id, "started_at": started_at}
+            try:
+                # The original is buffered in this process before it goes to the pool, so hold it to the upload limit
+                size = await self.storage.size(job["source"])
+                if size is None:
+                    raise ValueError("Source file not found")
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise ValueError(f"Source exceeds {settings.UPLOAD_MAX_BYTES} bytes")
+                data = b"".join([chunk async for chunk in limit_size(self.storage.read(job["source"]), settings.UPLOAD_MAX_BYTES)])
+                rendered = await asyncio.get_running_loop().run_in_executor(_get_pool(), render_derivatives, data)
+                derivatives = {}
+                for name, variant in rendered.items():
+                    key = derivative_key(job["source"], name)
+                    size = await self.storage.write(key, _single_chunk(variant["data"]))
+                    derivatives[name] = {
+                        "path": key,
+                        "url": f"{UPLOAD_URL_PREFIX}{key}",
+                        "width": variant["width"],
+                        "height": variant["height"],
+                        "size": size,
+                    }
+                await self.jobs_collection.update_one(
+                    claim,
+                    {"$set": {"status": "done", "derivatives": derivatives, "finished_at": datetime.utcnow()}}
+                )
+                if job.get("survey_id"):
+                    await self._record_on_survey(job["survey_id"], job["source"], derivatives)
+            except asyncio.CancelledError:
+                await self.jobs_collection.update_one(claim, {"$set": {"status": "pending"}})
+                raise
+            except Exception as e:
+                print(f"Error rendering derivatives for {job['source']}: {e}")
+                await self.jobs_collection.update_one(
+                    claim,
+                    {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}}
+                )
+
+    async def _record_on_survey(self, survey_id: str, source: str, derivatives: Dict[str, dict]):
+        # updated_at feeds the survey's ETag, so cached copies without the derivatives are invalidated
+        entry = {"source": source, **{name: derivative["path"] for name, derivative in derivatives.items()}}
+        result = await self.surveys_collection.update_one(
+            {"_id": ObjectId(survey_id), "image_derivatives.source": {"$ne": source}},
+            {"$push": {"image_derivatives": entry}, "$set": {"updated_at": datetime.now(UTC)}}
+        )
+        if result.matched_count == 0:
+            await self.surveys_collection.update_one(
+                {"_id": ObjectId(survey_id), "image_derivatives.source": source},
+                {"$set": {"image_derivatives.$": entry, "updated_at": datetime.now(UTC)}}
+            )
+
+    async def resume(self) -> int:
+        # Jobs left pending, or running past the stale timeout, are picked up again; with several
+        # workers each may schedule the same job, and the claim in run() lets only one render it
+        resumed = 0
+        async for job in self.jobs_collection.find(self._claimable(datetime.utcnow()), {"_id": 1}):
+            self._schedule(job["_id"])
+            resumed += 1
+        return resumed
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await self.jobs_collection.find_one({"_id": ObjectId(job_id)})
+
+    async def list_jobs(self, survey_id: str) -> List[dict]:
+        return await self.jobs_collection.find({"survey_id": survey_id}).sort("created_at", ASCENDING).to_list(length=None)
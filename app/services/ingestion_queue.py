@@ -0,0 +1,139 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import BulkWriteError
+from app.config import settings
+
+MAX_WRITE_ATTEMPTS = 3
+DUPLICATE_KEY = 11000
+
+Writer = Callable[[List[dict]], Awaitable[Dict[int, str]]]
+
+class QueueFullError(RuntimeError):
+    pass
+
+async def insert_batch(collection: AsyncCollection, documents: List[dict]) -> Dict[int, str]:
+    # Documents carry their _id, so a duplicate key means a retried flush already wrote them
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        return {
+            error["index"]: error.get("errmsg", "Write failed")
+            for error in e.details.get("writeErrors", [])
+            if error.get("code") != DUPLICATE_KEY
+        }
+    return {}
+
+class IngestionQueue:
+    def __init__(self, name: str, writer: Writer, max_size: int, batch_size: int, flush_interval: float):
+        self.name = name
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.rejected = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, document: dict, timeout: float):
+        if self._closed:
+            raise QueueFullError(f"{self.name} ingestion queue is shutting down")
+        try:
+            await asyncio.wait_for(self._queue.put(document), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} ingestion queue is full")
+        self.enqueued += 1
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[dict]):
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            try:
+                failed = await self.writer(batch)
+                break
+            except Exception as e:
+                print(f"Error flushing {len(batch)} documents to {self.name} (attempt {attempt + 1}): {e}")
+                if attempt + 1 == MAX_WRITE_ATTEMPTS:
+                    failed = {position: str(e) for position in range(len(batch))}
+                else:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+        for position, error in failed.items():
+            print(f"Dropped queued {self.name} document {batch[position].get('_id')}: {error}")
+        self.batches += 1
+        self.failed += len(failed)
+        self.written += len(batch) - len(failed)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def drain(self):
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+        }
+
+ingestion_queues: Dict[str, IngestionQueue] = {}
+
+def start_queue(name: str, writer: Writer) -> IngestionQueue:
+    queue = IngestionQueue(
+        name,
+        writer,
+        max_size=settings.INGESTION_QUEUE_SIZE,
+        batch_size=settings.INGESTION_BATCH_SIZE,
+        flush_interval=settings.INGESTION_FLUSH_INTERVAL_SECONDS,
+    )
+    queue.start()
+    ingestion_queues[name] = queue
+    return queue
+
+async def enqueue(name: str, document: dict):
+    queue = ingestion_queues.get(name)
+    if queue is None:
+        raise QueueFullError(f"{name} ingestion queue is not running")
+    await queue.put(document, settings.INGESTION_ENQUEUE_TIMEOUT_SECONDS)
+
+async def drain_queues():
+    await asyncio.gather(*(queue.drain() for queue in ingestion_queues.values()))
+    ingestion_queues.clear()
+
+def queue_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: queue.stats() for name, queue in ingestion_queues.items()}
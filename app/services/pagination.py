@@ -0,0 +1,69 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId, json_util
+from pymongo.asynchronous.collection import AsyncCollection
+from app.config import settings
+from app.database.indexes import assert_indexed
+
+ID_KEY = ("_id",)
+# Cursor values go straight into the keyset query, so they must be plain values of the key's type
+CURSOR_VALUE_TYPES = {
+    "_id": (ObjectId,),
+    "submitted_at": (datetime, type(None)),
+}
+
+def encode_cursor(document: dict, sort_keys: Sequence[str]) -> str:
+    values = [document.get(key) for key in sort_keys]
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_keys: Sequence[str]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise ValueError("Invalid pagination cursor")
+    for key, value in zip(sort_keys, values):
+        if isinstance(value, (dict, list)):
+            raise ValueError("Invalid pagination cursor")
+        if key in CURSOR_VALUE_TYPES and not isinstance(value, CURSOR_VALUE_TYPES[key]):
+            raise ValueError("Invalid pagination cursor")
+    return values
+
+def keyset_filter(sort_keys: Sequence[str], values: Sequence[Any]) -> Dict[str, Any]:
+    clauses = []
+    for position, key in enumerate(sort_keys):
+        clause = {sort_keys[i]: values[i] for i in range(position)}
+        clause[key] = {"$gt": values[position]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+async def paginate(
+        collection: AsyncCollection,
+        filter_criteria: Dict[str, Any],
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        sort_keys: Sequence[str] = ID_KEY,
+        projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    if projection and any(projection.values()):
+        projection = {**projection, **{key: 1 for key in sort_keys}}
+    query = filter_criteria
+    if cursor:
+        after = keyset_filter(sort_keys, decode_cursor(cursor, sort_keys))
+        query = {"$and": [filter_criteria, after]} if filter_criteria else after
+    find = collection.find(query, projection).sort([(key, 1) for key in sort_keys])
+    if skip and not cursor:
+        find = find.skip(skip)
+    if settings.STRICT_INDEX_MODE:
+        assert_indexed(await find.explain(), collection.name, query)
+    documents = await find.limit(limit + 1).to_list(length=None)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort_keys)
+    return documents, next_cursor
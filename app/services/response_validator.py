@@ -0,0 +1,136 @@
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Check = Callable[[Any], Optional[str]]
+
+MAX_CACHED_VALIDATORS = 1024
+
+def _length_checks(title: str, validation: dict) -> List[Check]:
+    checks = []
+    min_length = validation.get("min_length")
+    max_length = validation.get("max_length")
+    pattern = validation.get("pattern")
+    if min_length is not None:
+        checks.append(lambda value: f"Field '{title}' must be at least {min_length} characters" if len(value) < min_length else None)
+    if max_length is not None:
+        checks.append(lambda value: f"Field '{title}' must be at most {max_length} characters" if len(value) > max_length else None)
+    if pattern:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Field '{title}' has an invalid validation pattern: {e}")
+        checks.append(lambda value: f"Field '{title}' does not match the required format" if not regex.fullmatch(value) else None)
+    return checks
+
+def _compile_field(field: dict) -> Check:
+    field_id = field.get("field_id")
+    field_type = field.get("type")
+    title = field.get("title", field_id)
+    validation = field.get("validation") or {}
+
+    if field_type in ("STRING", "TEXT"):
+        extra = _length_checks(title, validation)
+        def check(value):
+            if not isinstance(value, str):
+                return f"Field '{title}' must be a string"
+            for rule in extra:
+                error = rule(value)
+                if error:
+                    return error
+            return None
+        return check
+
+    if field_type == "NUMBER":
+        min_value = validation.get("min_value")
+        max_value = validation.get("max_value")
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return f"Field '{title}' must be a number"
+            if min_value is not None and value < min_value:
+                return f"Field '{title}' must be at least {min_value}"
+            if max_value is not None and value > max_value:
+                return f"Field '{title}' must be at most {max_value}"
+            return None
+        return check
+
+    if field_type == "BOOLEAN":
+        return lambda value: None if isinstance(value, bool) else f"Field '{title}' must be a boolean (true/false)"
+
+    if field_type == "DATE":
+        return lambda value: None if isinstance(value, str) else f"Field '{title}' must be a date string (YYYY-MM-DD)"
+
+    if field_type == "EMAIL":
+        extra = _length_checks(title, validation)
+        def check(value):
+            if not isinstance(value, str):
+                return f"Field '{title}' must be a string"
+            if "@" not in value or "." not in value:
+                return f"Field '{title}' must be a valid email address"
+            for rule in extra:
+                error = rule(value)
+                if error:
+                    return error
+            return None
+        return check
+
+    if field_type == "OPTION":
+        options = field.get("options") or []
+        allowed = frozenset(option for option in options if isinstance(option, str))
+        message = f"Field '{title}' must be one of: {', '.join(options)}"
+        return lambda value: None if isinstance(value, str) and value in allowed else message
+
+    if field_type == "FILE":
+        return lambda value: None if isinstance(value, str) else f"Field '{title}' must be a file path string"
+
+    return lambda value: None
+
+class ResponseValidator:
+    def __init__(self, survey_schema: List[dict], updated_at: Any = None):
+        self.updated_at = updated_at
+        self.required: List[Tuple[str, str]] = []
+        self.fields: Dict[str, Tuple[bool, Check]] = {}
+        for field in survey_schema:
+            field_id = field.get("field_id")
+            is_required = field.get("required", True)
+            if is_required:
+                self.required.append((field_id, field.get("title", field_id)))
+            self.fields[field_id] = (is_required, _compile_field(field))
+
+    def validate(self, responses: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        for field_id, title in self.required:
+            if field_id not in responses:
+                return False, f"Required field '{title}' is missing"
+        fields = self.fields
+        for field_id, value in responses.items():
+            compiled = fields.get(field_id)
+            if compiled is None:
+                return False, f"Unknown field '{field_id}' not in template schema"
+            is_required, check = compiled
+            if value is None and not is_required:
+                continue
+            error = check(value)
+            if error:
+                return False, error
+        return True, None
+
+_validators: "OrderedDict[str, ResponseValidator]" = OrderedDict()
+
+def get_validator(template: dict) -> ResponseValidator:
+    template_id = str(template.get("_id"))
+    updated_at = template.get("updated_at")
+    validator = _validators.get(template_id)
+    if validator is not None and validator.updated_at == updated_at:
+        _validators.move_to_end(template_id)
+        return validator
+    validator = ResponseValidator(template.get("survey_schema", []), updated_at)
+    _validators[template_id] = validator
+    if len(_validators) > MAX_CACHED_VALIDATORS:
+        _validators.popitem(last=False)
+    return validator
+
+def clear_validators(template_id: Optional[str] = None):
+    if template_id is None:
+        _validators.clear()
+    else:
+        _validators.pop(str(template_id), None)
@@ -0,0 +1,160 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import UpdateOne, IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError
+
+SUBMISSIONS_FIELD = "_submissions"
+DUPLICATE_KEY = 11000
+
+RollupKey = Tuple[str, str, str]
+Increments = Dict[RollupKey, Dict[str, Any]]
+
+def encode_value(value: Any) -> str:
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    return str(value).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def decode_value(key: str) -> str:
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+def rollup_day(submitted_at: Optional[datetime]) -> str:
+    return (submitted_at or datetime.utcnow()).strftime("%Y-%m-%d")
+
+class ResponseRollupService:
+    INDEXES = {
+        "custom_survey_rollups": [
+            IndexModel(
+                [("template_id", ASCENDING), ("field_id", ASCENDING), ("day", ASCENDING)],
+                name="template_id_field_id_day",
+                unique=True
+            ),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
+        self.rollups_collection = db["custom_survey_rollups"]
+        self.responses_collection = db["custom_survey_responses"]
+        self.templates_collection = db["custom_survey_templates"]
+
+    def add_increments(self, increments: Increments, template: dict, responses: Dict[str, Any], day: str, sign: int = 1):
+        template_id = str(template["_id"])
+        increments[(template_id, SUBMISSIONS_FIELD, day)]["count"] += sign
+        for field in template.get("survey_schema", []):
+            field_id = field.get("field_id")
+            value = responses.get(field_id)
+            if value is None:
+                continue
+            rollup = increments[(template_id, field_id, day)]
+            rollup["count"] += sign
+            field_type = field.get("type")
+            if field_type == "NUMBER" and isinstance(value, (int, float)) and not isinstance(value, bool):
+                rollup["sum"] += sign * value
+            elif field_type in ("OPTION", "BOOLEAN"):
+                rollup[f"counts.{encode_value(value)}"] += sign
+
+    def new_increments(self) -> Increments:
+        return defaultdict(lambda: defaultdict(int))
+
+    async def apply(self, increments: Increments):
+        operations = []
+        for key, deltas in increments.items():
+            deltas = {path: delta for path, delta in deltas.items() if delta}
+            if not deltas:
+                continue
+            template_id, field_id, day = key
+            operations.append(UpdateOne(
+                {"template_id": template_id, "field_id": field_id, "day": day},
+                {"$inc": deltas},
+                upsert=True
+            ))
+        if not operations:
+            return
+        try:
+            await self.rollups_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Two concurrent upserts of a new rollup race on the unique index; the loser is retried
+            retry = [
+                operations[error["index"]]
+                for error in e.details.get("writeErrors", [])
+                if error.get("code") == DUPLICATE_KEY
+            ]
+            if len(retry) != len(e.details.get("writeErrors", [])):
+                raise
+            await self.rollups_collection.bulk_write(retry, ordered=False)
+
+    async def record(self, template: dict, responses: Dict[str, Any], submitted_at: Optional[datetime], sign: int = 1):
+        increments = self.new_increments()
+        self.add_increments(increments, template, responses, rollup_day(submitted_at), sign)
+        await self.apply(increments)
+
+    async def record_change(self, template: dict, old_responses: Dict[str, Any], new_responses: Dict[str, Any], submitted_at: Optional[datetime]):
+        increments = self.new_increments()
+        day = rollup_day(submitted_at)
+        self.add_increments(increments, template, old_responses, day, -1)
+        self.add_increments(increments, template, new_responses, day, 1)
+        await self.apply(increments)
+
+    async def get_rollups(self, template: dict, day_from: Optional[str] = None, day_to: Optional[str] = None) -> Dict[str, Any]:
+        template_id = str(template["_id"])
+        filter_criteria: Dict[str, Any] = {"template_id": template_id}
+        if day_from or day_to:
+            filter_criteria["day"] = {}
+            if day_from:
+                filter_criteria["day"]["$gte"] = day_from
+            if day_to:
+                filter_criteria["day"]["$lte"] = day_to
+        daily_submissions: List[Dict[str, Any]] = []
+        fields: Dict[str, Dict[str, Any]] = {}
+        async for rollup in self.rollups_collection.find(filter_criteria).sort("day", ASCENDING):
+            field_id = rollup["field_id"]
+            if field_id == SUBMISSIONS_FIELD:
+                daily_submissions.append({"day": rollup["day"], "count": int(rollup.get("count", 0))})
+                continue
+            summary = fields.setdefault(field_id, {"field_id": field_id, "count": 0})
+            summary["count"] += int(rollup.get("count", 0))
+            if "sum" in rollup:
+                summary["sum"] = summary.get("sum", 0) + rollup["sum"]
+            for key, count in (rollup.get("counts") or {}).items():
+                counts = summary.setdefault("counts", {})
+                value = decode_value(key)
+                counts[value] = counts.get(value, 0) + int(count)
+        for summary in fields.values():
+            if "sum" in summary:
+                summary["mean"] = summary["sum"] / summary["count"] if summary["count"] else None
+        return {
+            "template_id": template_id,
+            "daily_submissions": daily_submissions,
+            "total_submissions": sum(day["count"] for day in daily_submissions),
+            "fields": [
+                fields[field.get("field_id")]
+                for field in template.get("survey_schema", [])
+                if field.get("field_id") in fields
+            ],
+        }
+
+    async def rebuild(self, template: dict, flush_every: int = 10000) -> int:
+        template_id = str(template["_id"])
+        await self.rollups_collection.delete_many({"template_id": template_id})
+        increments = self.new_increments()
+        processed = 0
+        cursor = self.responses_collection.find(
+            {"template_id": template_id},
+            {"responses": 1, "submitted_at": 1},
+            batch_size=1000
+        )
+        async for response in cursor:
+            self.add_increments(increments, template, response.get("responses") or {}, rollup_day(response.get("submitted_at")))
+            processed += 1
+            if processed % flush_every == 0:
+                await self.apply(increments)
+                increments = self.new_increments()
+        await self.apply(increments)
+        return processed
+
+    async def rebuild_all(self) -> Dict[str, int]:
+        rebuilt = {}
+        async for template in self.templates_collection.find({}, {"survey_schema": 1}):
+            rebuilt[str(template["_id"])] = await self.rebuild(template)
+        return rebuilt
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo import IndexModel, TEXT
+from pymongo.asynchronous.database import AsyncDatabase
+from app.services.pagination import decode_cursor, encode_cursor
+
+SEARCH_SORT_KEYS = ("score", "type", "_id")
+SEARCH_SOURCES = {
+    "tag": {
+        "collection": "event_tags_surveys",
+        "projection": {
+            "event_name": 1,
+            "event_location": 1,
+            "organization_name": 1,
+            "status": 1,
+            "created_at": 1,
+        },
+    },
+    "website": {
+        "collection": "website_building_surveys",
+        "projection": {
+            "general_info.organization_name": 1,
+            "general_info.event_name": 1,
+            "general_info.event_location": 1,
+            "status": 1,
+            "created_at": 1,
+        },
+    },
+}
+
+class SearchService:
+    INDEXES = {
+        "event_tags_surveys": [
+            IndexModel(
+                [("event_name", TEXT), ("organization_name", TEXT), ("event_location", TEXT), ("event_description", TEXT)],
+                name="search_text",
+                weights={"event_name": 10, "organization_name": 8, "event_location": 5, "event_description": 1}
+            ),
+        ],
+        "website_building_surveys": [
+            IndexModel(
+                [
+                    ("general_info.organization_name", TEXT),
+                    ("general_info.event_name", TEXT),
+                    ("general_info.event_location", TEXT),
+                    ("general_info.event_type", TEXT),
+                    ("about.organization_story", TEXT),
+                ],
+                name="search_text",
+                weights={
+                    "general_info.organization_name": 10,
+                    "general_info.event_name": 10,
+                    "general_info.event_location": 5,
+                    "general_info.event_type": 3,
+                    "about.organization_story": 1,
+                }
+            ),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    def _decode(self, cursor: str) -> List[Any]:
+        last = decode_cursor(cursor, SEARCH_SORT_KEYS)
+        score, source, last_id = last
+        valid_score = isinstance(score, (int, float)) and not isinstance(score, bool)
+        valid_source = isinstance(source, str) and source in SEARCH_SOURCES
+        if not (valid_score and valid_source and isinstance(last_id, ObjectId)):
+            raise ValueError("Invalid pagination cursor")
+        return last
+
+    def _after(self, source: str, last: Sequence[Any]) -> Dict[str, Any]:
+        # Results are ordered by score desc, then source, then _id across both collections
+        score, last_source, last_id = last
+        if source > last_source:
+            return {"score": {"$lte": score}}
+        if source < last_source:
+            return {"score": {"$lt": score}}
+        return {"$or": [{"score": {"$lt": score}}, {"score": score, "_id": {"$gt": last_id}}]}
+
+    async def _search_source(self, source: str, query: str, limit: int, last: Optional[Sequence[Any]]) -> List[dict]:
+        config = SEARCH_SOURCES[source]
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"$text": {"$search": query}}},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        if last:
+            pipeline.append({"$match": self._after(source, last)})
+        pipeline += [
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit},
+            {"$project": {**config["projection"], "score": 1}},
+        ]
+        cursor = await self.db[config["collection"]].aggregate(pipeline)
+        documents = await cursor.to_list(length=None)
+        for document in documents:
+            document["type"] = source
+        return documents
+
+    async def search(
+            self,
+            query: str,
+            sources: Sequence[str] = tuple(SEARCH_SOURCES),
+            limit: int = 10,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        last = self._decode(cursor) if cursor else None
+        batches = await asyncio.gather(*(
+            self._search_source(source, query, limit + 1, last) for source in sources
+        ))
+        results = sorted(
+            (document for batch in batches for document in batch),
+            key=lambda document: (-document["score"], document["type"], document["_id"])
+        )
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1], SEARCH_SORT_KEYS)
+        return results, next_cursor
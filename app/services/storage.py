@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import uuid4
+from app.config import settings
+
+READ_CHUNK_SIZE = 256 * 1024
+
+class LocalStorage:
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.multipart_root = self.root / ".multipart"
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key '{key}'")
+        return path
+
+    async def _write_file(self, path: Path, chunks: AsyncIterator[bytes]) -> Tuple[int, str]:
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        # Unique per write, so a part resent while the first attempt is still streaming gets its own file
+        partial = path.with_name(f"{path.name}.{uuid4().hex}.partial")
+        handle = await asyncio.to_thread(open, partial, "wb")
+        size = 0
+        digest = hashlib.md5()
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(handle.write, chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        except BaseException:
+            handle.close()
+            partial.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(handle.close)
+        await asyncio.to_thread(os.replace, partial, path)
+        return size, digest.hexdigest()
+
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        size, _ = await self._write_file(self._path(key), chunks)
+        return size
+
+    async def create_multipart(self, key: str) -> str:
+        self._path(key)
+        return uuid4().hex
+
+    async def write_part(self, key: str, upload_id: str, part_number: int, chunks: AsyncIterator[bytes]) -> Tuple[str, int]:
+        size, etag = await self._write_file(self.multipart_root / upload_id / f"{part_number:05d}", chunks)
+        return etag, size
+
+    def _concatenate(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> int:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part_dir = self.multipart_root / upload_id
+        # Assembled beside the target and swapped in, so readers never see a half-written object
+        partial = path.with_name(f"{path.name}.{uuid4().hex}.partial")
+        try:
+            with open(partial, "wb") as target:
+                for part_number, _ in parts:
+                    with open(part_dir / f"{part_number:05d}", "rb") as part:
+                        shutil.copyfileobj(part, target, READ_CHUNK_SIZE)
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        shutil.rmtree(part_dir, ignore_errors=True)
+        return path.stat().st_size
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> int:
+        return await asyncio.to_thread(self._concatenate, key, upload_id, parts)
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        await asyncio.to_thread(shutil.rmtree, self.multipart_root / upload_id, True)
+
+    def _remove_stale_multipart(self, cutoff: datetime) -> int:
+        if not self.multipart_root.is_dir():
+            return 0
+        removed = 0
+        for part_dir in self.multipart_root.iterdir():
+            # The directory mtime moves with every part written into it
+            if part_dir.is_dir() and part_dir.stat().st_mtime < cutoff.timestamp():
+                shutil.rmtree(part_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+    async def abort_stale_multipart(self, cutoff: datetime) -> int:
+        return await asyncio.to_thread(self._remove_stale_multipart, cutoff)
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        if not await asyncio.to_thread(path.is_file):
+            return None
+        return (await asyncio.to_thread(path.stat)).st_size
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(handle.read, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            handle.close()
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._path(key).unlink, True)
+
+class S3Storage:
+    name = "s3"
+
+    def __init__(self, bucket: str, part_size: int, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client(
+                "s3",
+                region_name=settings.AWS_REGION,
+                endpoint_url=settings.S3_ENDPOINT_URL or None,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        # Bytes are sent as soon as a part fills up, so at most one part is held in memory
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        parts = []
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                size += len(chunk)
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = await self.create_multipart(key)
+                    body = bytes(buffer)
+                    buffer.clear()
+                    response = await asyncio.to_thread(
+                        self.client.upload_part,
+                        Bucket=self.bucket, Key=key, UploadId=upload_id,
+                        PartNumber=len(parts) + 1, Body=body
+                    )
+                    parts.append((len(parts) + 1, response["ETag"]))
+            if upload_id is None:
+                await asyncio.to_thread(self.client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer))
+                return size
+            if buffer:
+                response = await asyncio.to_thread(
+                    self.client.upload_part,
+                    Bucket=self.bucket, Key=key, UploadId=upload_id,
+                    PartNumber=len(parts) + 1, Body=bytes(buffer)
+                )
+                parts.append((len(parts) + 1, response["ETag"]))
+            await self.complete_multipart(key, upload_id, parts)
+            return size
+        except BaseException:
+            if upload_id is not None:
+                await self.abort_multipart(key, upload_id)
+            raise
+
+    async def create_multipart(self, key: str) -> str:
+        response = await asyncio.to_thread(self.client.create_multipart_upload, Bucket=self.bucket, Key=key)
+        return response["UploadId"]
+
+    async def write_part(self, key: str, upload_id: str, part_number: int, chunks: AsyncIterator[bytes]) -> Tuple[str, int]:
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=self.part_size) as spool:
+            async for chunk in chunks:
+                # Rolls over to disk once past part_size, so the write can block
+                await asyncio.to_thread(spool.write, chunk)
+                size += len(chunk)
+            await asyncio.to_thread(spool.seek, 0)
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                PartNumber=part_number, Body=spool, ContentLength=size
+            )
+        return response["ETag"], size
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> int:
+        await asyncio.to_thread(
+            self.client.complete_multipart_upload,
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": number, "ETag": etag} for number, etag in parts]}
+        )
+        return await self.size(key)
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        try:
+            await asyncio.to_thread(self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except Exception as e:
+            print(f"Error aborting multipart upload {upload_id}: {e}")
+
+    def _list_stale_multipart(self, cutoff: datetime) -> List[Tuple[str, str]]:
+        stale = []
+        for page in self.client.get_paginator("list_multipart_uploads").paginate(Bucket=self.bucket):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"].timestamp() < cutoff.timestamp():
+                    stale.append((upload["Key"], upload["UploadId"]))
+        return stale
+
+    async def abort_stale_multipart(self, cutoff: datetime) -> int:
+        # A bucket lifecycle rule with AbortIncompleteMultipartUpload does the same on the S3 side
+        stale = await asyncio.to_thread(self._list_stale_multipart, cutoff)
+        for key, upload_id in stale:
+            await self.abort_multipart(key, upload_id)
+        return len(stale)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            response = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except Exception:
+            return None
+        return response["ContentLength"]
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+@lru_cache(maxsize=None)
+def get_storage():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(settings.S3_BUCKET_NAME, settings.UPLOAD_PART_SIZE)
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+    raise ValueError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'")
@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+from pymongo import UpdateOne, IndexModel, ASCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+
+TagKind = Literal["tag", "category"]
+# Prefixes up to this length match large slices of the index, so their top suggestions are precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+PRECOMPUTED_TOP = 50
+
+def normalize_tag(tag: str) -> str:
+    return " ".join(tag.split()).casefold()
+
+def survey_tags(survey: dict) -> Dict[Tuple[str, str], str]:
+    tags = {}
+    for tag in survey.get("requested_tags") or []:
+        if isinstance(tag, str) and normalize_tag(tag):
+            tags.setdefault(("tag", normalize_tag(tag)), " ".join(tag.split()))
+    category = survey.get("tag_category")
+    if isinstance(category, str) and normalize_tag(category):
+        tags[("category", normalize_tag(category))] = " ".join(category.split())
+    return tags
+
+def _rank(entry: Tuple[str, str, int]) -> int:
+    # Entries are sorted by key, and nlargest keeps that order between equal counts
+    return entry[2]
+
+class TagIndex:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._keys: Dict[str, List[str]] = {}
+        self._entries: Dict[str, List[Tuple[str, str, int]]] = {}
+        self._top: Dict[str, Dict[str, List[Tuple[str, str, int]]]] = {}
+        self._built_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def build(self, rows: Iterable[dict]):
+        entries = defaultdict(list)
+        for row in rows:
+            if row.get("count", 0) > 0:
+                entries[row["kind"]].append((row["key"], row["tag"], int(row["count"])))
+        keys = {}
+        top = {}
+        for kind, kind_entries in entries.items():
+            kind_entries.sort()
+            keys[kind] = [entry[0] for entry in kind_entries]
+            buckets = defaultdict(list)
+            for entry in kind_entries:
+                for length in range(1, min(PRECOMPUTED_PREFIX_LENGTH, len(entry[0])) + 1):
+                    buckets[entry[0][:length]].append(entry)
+            top[kind] = {
+                prefix: heapq.nlargest(PRECOMPUTED_TOP, bucket, key=_rank)
+                for prefix, bucket in buckets.items()
+            }
+        self._entries, self._keys, self._top = dict(entries), keys, top
+        self._built_at = time.monotonic()
+
+    async def refresh(self, collection: AsyncCollection, force: bool = False):
+        if not force and self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._lock.locked() and self._built_at is not None:
+            return
+        async with self._lock:
+            if not force and self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds:
+                return
+            rows = await collection.find(
+                {"count": {"$gt": 0}},
+                {"_id": 0, "kind": 1, "key": 1, "tag": 1, "count": 1}
+            ).to_list(length=None)
+            self.build(rows)
+
+    def suggest(self, kind: str, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        prefix = normalize_tag(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and limit <= PRECOMPUTED_TOP:
+            matches = self._top.get(kind, {}).get(prefix, [])[:limit]
+        else:
+            keys = self._keys.get(kind, [])
+            entries = self._entries.get(kind, [])
+            start = bisect_left(keys, prefix)
+            end = bisect_left(keys, prefix + "\U0010ffff", start)
+            matches = heapq.nlargest(limit, entries[start:end], key=_rank)
+        return [{"tag": tag, "count": count} for _, tag, count in matches]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tags": {kind: len(keys) for kind, keys in self._keys.items()},
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if self._built_at is not None else None,
+        }
+
+tag_index = TagIndex(refresh_seconds=settings.TAG_INDEX_REFRESH_SECONDS)
+
+class TagCountService:
+    INDEXES = {
+        "tag_counts": [
+            IndexModel([("kind", ASCENDING), ("key", ASCENDING)], name="kind_key", unique=True),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
+        self.counts_collection = db["tag_counts"]
+        self.surveys_collection = db["event_tags_surveys"]
+
+    def add_increments(self, increments: Counter, displays: Dict[Tuple[str, str], str], survey: dict, sign: int = 1):
+        for tag_key, display in survey_tags(survey).items():
+            increments[tag_key] += sign
+            displays.setdefault(tag_key, display)
+
+    async def apply(self, increments: Counter, displays: Dict[Tuple[str, str], str]):
+        operations = [
+            UpdateOne(
+                {"kind": kind, "key": key},
+                {"$inc": {"count": delta}, "$setOnInsert": {"tag": displays[(kind, key)]}},
+                upsert=True
+            )
+            for (kind, key), delta in increments.items()
+            if delta
+        ]
+        if operations:
+            await self.counts_collection.bulk_write(operations, ordered=False)
+
+    async def record(self, surveys: List[dict], sign: int = 1):
+        increments, displays = Counter(), {}
+        for survey in surveys:
+            self.add_increments(increments, displays, survey, sign)
+        await self.apply(increments, displays)
+
+    async def record_change(self, old_survey: dict, new_survey: dict):
+        increments, displays = Counter(), {}
+        self.add_increments(increments, displays, old_survey, -1)
+        self.add_increments(increments, displays, new_survey, 1)
+        await self.apply(increments, displays)
+
+    async def suggest(self, kind: str, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        await tag_index.refresh(self.counts_collection)
+        return tag_index.suggest(kind, prefix, limit)
+
+    async def rebuild(self) -> int:
+        increments, displays = Counter(), {}
+        async for survey in self.surveys_collection.find({}, {"requested_tags": 1, "tag_category": 1}, batch_size=1000):
+            self.add_increments(increments, displays, survey)
+        await self.counts_collection.delete_many({})
+        await self.apply(increments, displays)
+        await tag_index.refresh(self.counts_collection, force=True)
+        return len(increments)
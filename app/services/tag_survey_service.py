@@ -1,25 +1,68 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from bson import ObjectId
-from pymongo.database import Database
+from pymongo import IndexModel, ASCENDING, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from app.database.monitoring import TAG_COUNT_FAILURES
 from app.models.tag_survey import TagSurveyCreate, TagSurveyUpdate
+from app.services.count_cache import TotalMode, count_cache, count_total
+from app.services.ingestion_queue import enqueue, insert_batch
+from app.services.pagination import paginate
+from app.services.tag_count_service import TagCountService
 
 class TagSurveyService:
-    def __init__(self, db: Database):
+    INDEXES = {
+        "event_tags_surveys": [
+            IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+            IndexModel([("organizer_email", ASCENDING), ("_id", ASCENDING)], name="organizer_email_id"),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase):
         self.collection = db["event_tags_surveys"]
+        self.tags = TagCountService(db)
+
+    async def _record_tags(self, operation: str, update):
+        # The survey write already happened; a failure here leaves tag_counts behind until it is rebuilt
+        try:
+            await update
+        except Exception as e:
+            TAG_COUNT_FAILURES.labels(operation).inc()
+            print(f"Error updating tag counts: {e}")
 
-    def create_survey(self, survey_data: TagSurveyCreate) -> str:
+    def _new_survey(self, survey_data: TagSurveyCreate) -> dict:
         survey_dict = survey_data.model_dump()
         survey_dict["created_at"] = datetime.utcnow()
         survey_dict["updated_at"] = datetime.utcnow()
         if "status" not in survey_dict:
             survey_dict["status"] = "pending"
-        result = self.collection.insert_one(survey_dict)
+        return survey_dict
+
+    async def create_survey(self, survey_data: TagSurveyCreate) -> str:
+        survey_dict = self._new_survey(survey_data)
+        result = await self.collection.insert_one(survey_dict)
+        count_cache.invalidate(self.collection.name)
+        await self._record_tags("create", self.tags.record([survey_dict]))
         return str(result.inserted_id)
 
-    def get_survey_by_id(self, survey_id: str) -> Optional[dict]:
+    async def enqueue_survey(self, survey_data: TagSurveyCreate) -> str:
+        survey_dict = self._new_survey(survey_data)
+        survey_dict["_id"] = ObjectId()
+        await enqueue(self.collection.name, survey_dict)
+        return str(survey_dict["_id"])
+
+    async def write_surveys(self, documents: List[dict]) -> Dict[int, str]:
+        failed = await insert_batch(self.collection, documents)
+        count_cache.invalidate(self.collection.name)
+        # Not raised: the queue would retry the batch and count the tags twice
+        await self._record_tags("batch", self.tags.record(
+            [document for position, document in enumerate(documents) if position not in failed]
+        ))
+        return failed
+
+    async def get_survey_by_id(self, survey_id: str) -> Optional[dict]:
         try:
-            surveys = self.collection.find_one({"_id": ObjectId(survey_id)})
+            surveys = await self.collection.find_one({"_id": ObjectId(survey_id)})
             if surveys:
                 surveys["_id"] = str(surveys["_id"])
             return surveys
@@ -27,54 +70,54 @@ class TagSurveyService:
             print(f"Error get the tag survey: {e}")
             return None
 
-    def get_all_surveys(self, skip: int = 0, limit: int = 10) -> List[dict]:
-        surveys = list(self.collection.find().skip(skip).limit(limit))
-        for survey in surveys:
-            survey["_id"] = str(survey["_id"])
-        return surveys
+    async def get_all_surveys(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        return await paginate(self.collection, {}, limit, cursor=cursor, skip=skip)
 
-    def update_survey(self, survey_id: str, survey_data: TagSurveyUpdate) -> bool:
+    async def update_survey(self, survey_id: str, survey_data: TagSurveyUpdate) -> bool:
         try:
             update_dict = survey_data.model_dump(exclude_unset=True)
             if not update_dict:
                 return False
             update_dict["updated_at"] = datetime.utcnow()
-            result = self.collection.update_one(
+            previous = await self.collection.find_one_and_update(
                 {"_id": ObjectId(survey_id)},
-                {"$set": update_dict}
+                {"$set": update_dict},
+                projection={"requested_tags": 1, "tag_category": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count > 0
+            count_cache.invalidate(self.collection.name)
+            if previous is None:
+                return False
+            if "requested_tags" in update_dict or "tag_category" in update_dict:
+                await self._record_tags("update", self.tags.record_change(previous, {**previous, **update_dict}))
+            return True
         except Exception as e:
             print(f"Error updating tag survey: {e}")
             return False
 
-    def delete_survey(self, survey_id: str) -> bool:
+    async def delete_survey(self, survey_id: str) -> bool:
         try:
-            survey_result = self.collection.delete_one({"_id": ObjectId(survey_id)})
-            return survey_result.deleted_count > 0
+            deleted = await self.collection.find_one_and_delete(
+                {"_id": ObjectId(survey_id)},
+                projection={"requested_tags": 1, "tag_category": 1}
+            )
+            count_cache.invalidate(self.collection.name)
+            if deleted is None:
+                return False
+            await self._record_tags("delete", self.tags.record([deleted], sign=-1))
+            return True
         except Exception as e:
             print(f"Error deleting tag survey: {e}")
             return False
 
-    def count_surveys(self) -> int:
-        return self.collection.count_documents({})
+    async def suggest_tags(self, prefix: str, kind: str = "tag", limit: int = 10) -> List[dict]:
+        return await self.tags.suggest(kind, prefix, limit)
+
+    async def count_surveys(self, mode: TotalMode = "estimate") -> Optional[int]:
+        return await count_total(self.collection, {}, mode)
 
-    def get_survey_by_status(self, status: str, skip: int = 0, limit: int = 10) -> List[dict]:
-        surveys = list(
-            self.collection.find({"status": status})
-            .skip(skip)
-            .limit(limit)
-        )
-        for survey in surveys:
-            survey["_id"] = str(survey["_id"])
-        return surveys
+    async def get_survey_by_status(self, status: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        return await paginate(self.collection, {"status": status}, limit, cursor=cursor, skip=skip)
 
-    def get_survey_by_organizer(self, organizer_email: str, skip: int = 0, limit: int = 10) -> List[dict]:
-        survey_organizers = list(
-            self.collection.find({"organizer_email": organizer_email})
-            .skip(skip)
-            .limit(limit)
-        )
-        for survey_organizer in survey_organizers:
-            survey_organizer["_id"] = str(survey_organizer["_id"])
-        return survey_organizers
\ No newline at end of file
+    async def get_survey_by_organizer(self, organizer_email: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        return await paginate(self.collection, {"organizer_email": organizer_email}, limit, cursor=cursor, skip=skip)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from bson import ObjectId
+from pymongo.asynchronous.collection import AsyncCollection
+from app.config import settings
+
+class TemplateCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, collection: AsyncCollection, template_id: str) -> Optional[dict]:
+        key = str(template_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        template = await collection.find_one({"_id": ObjectId(key)})
+        if template is None:
+            self._entries.pop(key, None)
+            return None
+        self.put(template)
+        return template
+
+    async def get_many(self, collection: AsyncCollection, template_ids: Iterable[str]) -> Dict[str, dict]:
+        found = {}
+        missing = []
+        now = time.monotonic()
+        for template_id in template_ids:
+            key = str(template_id)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = entry[1]
+            elif ObjectId.is_valid(key):
+                self.misses += 1
+                missing.append(ObjectId(key))
+        if missing:
+            async for template in collection.find({"_id": {"$in": missing}}):
+                self.put(template)
+                found[str(template["_id"])] = template
+        return found
+
+    def put(self, template: dict):
+        key = str(template["_id"])
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, template)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, template_id: str):
+        self._entries.pop(str(template_id), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+template_cache = TemplateCache(
+    max_size=settings.TEMPLATE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TEMPLATE_CACHE_TTL_SECONDS,
+)
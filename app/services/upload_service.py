@@ -0,0 +1,175 @@
+import asyncio
+import mimetypes
+import re
+from datetime import datetime, timedelta, UTC
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import uuid4
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+from app.services.storage import get_storage
+
+UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+class UploadTooLargeError(ValueError):
+    pass
+
+def safe_filename(filename: str) -> str:
+    name = UNSAFE_FILENAME.sub("_", filename.replace("\\", "/").rsplit("/", 1)[-1]).strip("._")
+    return name[:200] or "file"
+
+def new_key(filename: str) -> str:
+    return f"{datetime.utcnow():%Y/%m/%d}/{uuid4().hex}/{safe_filename(filename)}"
+
+async def limit_size(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+        yield chunk
+
+class UploadService:
+    INDEXES = {
+        "uploads": [
+            IndexModel([("key", ASCENDING)], name="key", unique=True),
+        ],
+        "upload_sessions": [
+            IndexModel(
+                [("created_at", ASCENDING)],
+                name="created_at_ttl",
+                expireAfterSeconds=settings.UPLOAD_SESSION_TTL_SECONDS
+            ),
+        ],
+    }
+
+    def __init__(self, db: AsyncDatabase, storage=None):
+        self.uploads_collection = db["uploads"]
+        self.sessions_collection = db["upload_sessions"]
+        self.storage = storage or get_storage()
+
+    async def _record(self, key: str, filename: str, content_type: Optional[str], size: int) -> Dict[str, Any]:
+        upload = {
+            "key": key,
+            "filename": filename,
+            "content_type": content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "size": size,
+            "backend": self.storage.name,
+            "created_at": datetime.utcnow(),
+        }
+        result = await self.uploads_collection.insert_one(upload)
+        return self.reference(result.inserted_id, upload)
+
+    def reference(self, upload_id: ObjectId, upload: dict) -> Dict[str, Any]:
+        return {
+            "file_id": str(upload_id),
+            "path": upload["key"],
+            "url": f"/api/v1/uploads/files/{upload['key']}",
+            "filename": upload["filename"],
+            "content_type": upload["content_type"],
+            "size": upload["size"],
+        }
+
+    async def upload(self, filename: str, content_type: Optional[str], chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        key = new_key(filename)
+        size = await self.storage.write(key, limit_size(chunks, settings.UPLOAD_MAX_BYTES))
+        return await self._record(key, filename, content_type, size)
+
+    async def create_multipart(self, filename: str, content_type: Optional[str]) -> Dict[str, Any]:
+        key = new_key(filename)
+        backend_upload_id = await self.storage.create_multipart(key)
+        session = {
+            "key": key,
+            "filename": filename,
+            "content_type": content_type,
+            "backend_upload_id": backend_upload_id,
+            "parts": {},
+            "created_at": datetime.utcnow(),
+        }
+        result = await self.sessions_collection.insert_one(session)
+        return {"upload_id": str(result.inserted_id), "key": key, "max_part_bytes": settings.UPLOAD_MAX_BYTES}
+
+    async def _get_session(self, upload_id: str) -> Optional[dict]:
+        if not ObjectId.is_valid(upload_id):
+            return None
+        return await self.sessions_collection.find_one({"_id": ObjectId(upload_id)})
+
+    def _parts(self, session: dict) -> list:
+        return sorted(
+            ({"part_number": int(number), **part} for number, part in session.get("parts", {}).items()),
+            key=lambda part: part["part_number"]
+        )
+
+    async def get_multipart(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        session = await self._get_session(upload_id)
+        if not session:
+            return None
+        return {
+            "upload_id": upload_id,
+            "key": session["key"],
+            "filename": session["filename"],
+            "parts": self._parts(session),
+        }
+
+    async def upload_part(self, upload_id: str, part_number: int, chunks: AsyncIterator[bytes]) -> Optional[Dict[str, Any]]:
+        session = await self._get_session(upload_id)
+        if not session:
+            return None
+        etag, size = await self.storage.write_part(
+            session["key"], session["backend_upload_id"], part_number,
+            limit_size(chunks, settings.UPLOAD_MAX_BYTES)
+        )
+        await self.sessions_collection.update_one(
+            {"_id": session["_id"]},
+            {"$set": {f"parts.{part_number}": {"etag": etag, "size": size}}}
+        )
+        return {"part_number": part_number, "etag": etag, "size": size}
+
+    async def complete_multipart(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        session = await self._get_session(upload_id)
+        if not session:
+            return None
+        parts = self._parts(session)
+        if not parts:
+            raise ValueError("No parts have been uploaded")
+        size = await self.storage.complete_multipart(
+            session["key"], session["backend_upload_id"],
+            [(part["part_number"], part["etag"]) for part in parts]
+        )
+        await self.sessions_collection.delete_one({"_id": session["_id"]})
+        return await self._record(session["key"], session["filename"], session.get("content_type"), size)
+
+    async def abort_multipart(self, upload_id: str) -> bool:
+        session = await self._get_session(upload_id)
+        if not session:
+            return False
+        await self.storage.abort_multipart(session["key"], session["backend_upload_id"])
+        await self.sessions_collection.delete_one({"_id": session["_id"]})
+        return True
+
+    async def sweep_abandoned_multipart(self) -> int:
+        # The TTL index only forgets the session record; the parts it left in storage are removed here
+        cutoff = datetime.now(UTC) - timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+        return await self.storage.abort_stale_multipart(cutoff)
+
+    async def open(self, key: str) -> Optional[Dict[str, Any]]:
+        size = await self.storage.size(key)
+        if size is None:
+            return None
+        return {
+            "size": size,
+            "content_type": mimetypes.guess_type(key)[0] or "application/octet-stream",
+            "chunks": self.storage.read(key),
+        }
+
+async def run_multipart_sweep(db: AsyncDatabase, interval_seconds: float):
+    service = UploadService(db)
+    while True:
+        try:
+            removed = await service.sweep_abandoned_multipart()
+            if removed:
+                print(f"Removed {removed} abandoned multipart uploads")
+        except Exception as e:
+            print(f"Error sweeping abandoned multipart uploads: {e}")
+        await asyncio.sleep(interval_seconds)
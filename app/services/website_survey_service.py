@@ -1,34 +1,95 @@
-from pymongo.database import Database
+import re
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from datetime import datetime, UTC
-from typing import List, Optional
-from app.models.website_survey import SurveyCreate
+from typing import Dict, List, Optional, Tuple
+from app.models.website_survey import SurveyCreate, SurveyResponse
+from app.config import settings
+from app.services.count_cache import TotalMode, count_cache, count_total
+from app.services.image_derivative_service import ImageDerivativeService
+from app.services.pagination import paginate
+
+FIELD_PATH = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+TOP_LEVEL_FIELDS = {
+    field.alias or name
+    for name, field in SurveyResponse.model_fields.items()
+}
+SUMMARY_PROJECTION = {
+    "general_info.organization_name": 1,
+    "general_info.event_name": 1,
+    "general_info.event_date": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+def build_projection(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    if not fields:
+        return None
+    projection = {}
+    for path in (part.strip() for part in fields.split(",")):
+        if not path:
+            continue
+        if not FIELD_PATH.match(path) or path.split(".", 1)[0] not in TOP_LEVEL_FIELDS:
+            raise ValueError(f"Unknown field '{path}' in fields")
+        # MongoDB rejects a projection that names both a field and one of its subfields
+        for other in projection:
+            if other != path and (other.startswith(path + ".") or path.startswith(other + ".")):
+                raise ValueError(f"Fields '{other}' and '{path}' overlap")
+        projection[path] = 1
+    return projection or None
 
 class WebsiteSurveyService:
-    def __init__(self, db: Database):
+    INDEXES = {
+        "website_building_surveys": [],
+    }
+
+    def __init__(self, db: AsyncDatabase):
         self.collection = db["website_building_surveys"]
+        self.derivatives = ImageDerivativeService(db)
 
-    def submit(self, survey_data: SurveyCreate) -> str:
+    async def submit(self, survey_data: SurveyCreate) -> str:
         survey_dict = survey_data.model_dump()
         survey_dict["created_at"] = datetime.now(UTC)
         survey_dict["updated_at"] = datetime.now(UTC)
-        result = self.collection.insert_one(survey_dict)
+        result = await self.collection.insert_one(survey_dict)
+        count_cache.invalidate(self.collection.name)
+        if settings.IMAGE_DERIVATIVES_ENABLED:
+            try:
+                await self.derivatives.enqueue_for_survey(str(result.inserted_id), survey_dict)
+            except Exception as e:
+                print(f"Error queueing image derivatives: {e}")
         return str(result.inserted_id)
 
-    def get_by_id(self, survey_id: str) -> Optional[dict]:
+    async def get_by_id(self, survey_id: str, fields: Optional[str] = None) -> Optional[dict]:
+        projection = build_projection(fields)
         try:
-            survey = self.collection.find_one({"_id": ObjectId(survey_id)})
+            survey = await self.collection.find_one({"_id": ObjectId(survey_id)}, projection)
             survey["_id"] = str(survey["_id"])
             return survey
         except Exception as e:
             print(f"Error getting survey: {e}")
             return None
 
-    def list_submissions(self, skip: int = 0, limit: int = 10) -> List[dict]:
-        surveys = list(self.collection.find().skip(skip).limit(limit))
-        for survey in surveys:
-            survey["_id"] = str(survey["_id"])
-        return surveys
+    async def get_version(self, survey_id: str) -> Optional[dict]:
+        try:
+            return await self.collection.find_one({"_id": ObjectId(survey_id)}, {"updated_at": 1})
+        except Exception as e:
+            print(f"Error getting survey version: {e}")
+            return None
+
+    async def list_submissions(
+            self,
+            skip: int = 0,
+            limit: int = 10,
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,
+            view: str = "summary"
+    ) -> Tuple[List[dict], Optional[str]]:
+        projection = build_projection(fields)
+        if projection is None and view == "summary":
+            projection = SUMMARY_PROJECTION
+        return await paginate(self.collection, {}, limit, cursor=cursor, skip=skip, projection=projection)
 
-    def count(self) -> int:
-        return self.collection.count_documents({})
\ No newline at end of file
+    async def count(self, mode: TotalMode = "estimate") -> Optional[int]:
+        return await count_total(self.collection, {}, mode)
\ No newline at end of file
@@ -0,0 +1,458 @@
+"""
+End-to-end latency and throughput of every survey route against seeded data.
+
+Let the suite start a throwaway mongod (its data directory is removed afterwards):
+
+    python -m benchmarks.endpoint_suite --mongod mongod --templates 100 --responses 1000000 --output before.json
+
+or seed a database on a running server, which is dropped afterwards:
+
+    python -m benchmarks.endpoint_suite --mongo-uri mongodb://localhost:27017 --output after.json --compare before.json
+
+The API is started with uvicorn in a subprocess against the seeded database and
+every route of the website, tag, template and response routers is driven in turn
+at a fixed concurrency. Payloads and IDs come from a seeded RNG, so two runs with
+the same arguments send the same traffic. The report is JSON keyed by
+"METHOD /route", with requests/sec and p50/p95/p99 latency per route; --compare
+prints the change against an earlier report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import httpx
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from app.config import settings
+from app.database.indexes import ensure_indexes
+from app.models.custom_survey_template import CustomSurveyTemplateCreate
+from app.models.tag_survey import TagSurveyCreate
+from app.models.website_survey import SurveyCreate
+from app.services.custom_survey_template_service import CustomSurveyTemplateService
+from app.services.rollup_service import ResponseRollupService
+from app.services.tag_count_service import TagCountService
+from benchmarks.payloads import (
+    STATUSES,
+    TAGS,
+    response_payload,
+    response_values,
+    tag_survey_payload,
+    template_payload,
+    website_survey_payload,
+)
+from benchmarks.revision import ROOT, git_commit
+
+SEED_BATCH = 10000
+SAMPLED_IDS = 10000
+BODIES_PER_TEMPLATE = 50
+HISTORY_DAYS = 90
+API = "/api/v1"
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_for_mongo(uri: str, timeout: float = 30.0):
+    client = AsyncMongoClient(uri, serverSelectionTimeoutMS=1000)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                await client.admin.command("ping")
+                return
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"MongoDB at {uri} did not come up within {timeout}s")
+                await asyncio.sleep(0.5)
+    finally:
+        await client.close()
+
+def start_mongod(binary: str) -> Tuple[subprocess.Popen, str, str]:
+    dbpath = tempfile.mkdtemp(prefix="survey-bench-")
+    port = free_port()
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, f"mongodb://127.0.0.1:{port}/", dbpath
+
+def start_api(uri: str, database: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        MONGO_URI=uri,
+        MONGO_DB=database,
+        RESPONSE_COUNT_RECONCILE_INTERVAL_SECONDS="0",
+        IMAGE_DERIVATIVES_ENABLED="false",
+        PROFILING_SAMPLE_RATE="0",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+    )
+
+async def wait_for_api(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"API exited with status {process.returncode} during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"API at {url} did not become healthy within {timeout}s")
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def insert_batches(collection, documents, total: int):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == SEED_BATCH:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    print({"seeded": collection.name, "documents": total})
+
+def template_documents(start: int, count: int, fields: int, now: datetime):
+    for index in range(start, start + count):
+        document = CustomSurveyTemplateCreate(**template_payload(index, fields)).model_dump()
+        document.update(_id=ObjectId(), created_at=now, updated_at=now, response_count=0)
+        yield document
+
+def response_documents(templates: List[dict], count: int, rng: random.Random, now: datetime, sampled: List[str], step: int):
+    bodies = {
+        str(template["_id"]): [response_values(template["survey_schema"], rng) for _ in range(BODIES_PER_TEMPLATE)]
+        for template in templates
+    }
+    for index in range(count):
+        template = templates[index % len(templates)]
+        template_id = str(template["_id"])
+        document = {
+            "_id": ObjectId(),
+            "template_id": template_id,
+            "responses": rng.choice(bodies[template_id]),
+            "submitted_by": f"person{rng.randint(0, 99999)}@example.com",
+            "metadata": {"user_agent": "benchmark", "ip": "127.0.0.1"},
+            "template_name": template["name"],
+            "submitted_at": now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400)),
+        }
+        if index % step == 0:
+            sampled.append(str(document["_id"]))
+        yield document
+
+def website_documents(start: int, count: int, photos: int, rng: random.Random, now: datetime, ids: List[str]):
+    for index in range(start, start + count):
+        document = SurveyCreate(**website_survey_payload(index, photos, photos // 2, photos // 2)).model_dump()
+        document.update(_id=ObjectId(), status=rng.choice(STATUSES), created_at=now, updated_at=now)
+        ids.append(str(document["_id"]))
+        yield document
+
+def tag_documents(start: int, count: int, rng: random.Random, now: datetime, ids: List[str]):
+    for index in range(start, start + count):
+        document = TagSurveyCreate(**tag_survey_payload(index)).model_dump()
+        document.update(_id=ObjectId(), status=rng.choice(STATUSES), created_at=now, updated_at=now)
+        ids.append(str(document["_id"]))
+        yield document
+
+async def seed(db, args, pool_size: int) -> dict:
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    await ensure_indexes(db)
+
+    templates = list(template_documents(0, args.templates, args.fields, now))
+    spare_templates = list(template_documents(args.templates, pool_size, args.fields, now))
+    await insert_batches(db["custom_survey_templates"], templates + spare_templates, len(templates) + len(spare_templates))
+
+    response_ids: List[str] = []
+    spare_responses: List[str] = []
+    await insert_batches(
+        db["custom_survey_responses"],
+        response_documents(templates, args.responses, rng, now, response_ids, max(1, args.responses // SAMPLED_IDS)),
+        args.responses
+    )
+    await insert_batches(
+        db["custom_survey_responses"],
+        response_documents(templates, pool_size, rng, now, spare_responses, 1),
+        pool_size
+    )
+
+    website_ids: List[str] = []
+    await insert_batches(
+        db["website_building_surveys"],
+        website_documents(0, args.websites, args.photos, rng, now, website_ids),
+        args.websites
+    )
+    tag_ids: List[str] = []
+    spare_tags: List[str] = []
+    await insert_batches(db["event_tags_surveys"], tag_documents(0, args.tags, rng, now, tag_ids), args.tags)
+    await insert_batches(
+        db["event_tags_surveys"],
+        tag_documents(args.tags, pool_size, rng, now, spare_tags),
+        pool_size
+    )
+
+    await ResponseRollupService(db).rebuild_all()
+    await CustomSurveyTemplateService(db).reconcile_response_counts(confirm=False)
+    await TagCountService(db).rebuild()
+    print({"seeded": "all", "seconds": round(time.perf_counter() - started, 1)})
+    return {
+        "templates": [(str(template["_id"]), template["survey_schema"]) for template in templates],
+        "responses": response_ids,
+        "websites": website_ids,
+        "tags": tag_ids,
+        "organizers": sorted({f"organizer{index % 200}@example.com" for index in range(args.tags)}),
+        "spare_templates": [str(template["_id"]) for template in spare_templates],
+        "spare_responses": spare_responses,
+        "spare_tags": spare_tags,
+    }
+
+def build_scenarios(fixture: dict, args) -> List[Tuple[str, Callable[[random.Random, int], Request], float]]:
+    templates = fixture["templates"]
+    day_from = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
+    counter = iter(range(10 ** 9))
+
+    def template(rng: random.Random) -> Tuple[str, list]:
+        return rng.choice(templates)
+
+    def response_body(rng: random.Random) -> dict:
+        template_id, schema = template(rng)
+        return response_payload(template_id, schema, rng)
+
+    # (name, request factory, share of --requests)
+    return [
+        ("GET /website-survey/", lambda rng, n: ("GET", f"{API}/website-survey/", {"params": {"limit": 20}}), 1.0),
+        ("POST /website-survey/", lambda rng, n: (
+            "POST", f"{API}/website-survey/", {"json": website_survey_payload(10 ** 6 + n, args.photos, args.photos // 2, args.photos // 2)}
+        ), 1.0),
+        ("GET /website-survey/{survey_id}", lambda rng, n: (
+            "GET", f"{API}/website-survey/{rng.choice(fixture['websites'])}", {}
+        ), 1.0),
+
+        ("POST /tag-survey/", lambda rng, n: ("POST", f"{API}/tag-survey/", {"json": tag_survey_payload(10 ** 6 + n)}), 1.0),
+        ("GET /tag-survey/", lambda rng, n: ("GET", f"{API}/tag-survey/", {"params": {"limit": 20}}), 1.0),
+        ("GET /tag-survey/tags/suggest", lambda rng, n: (
+            "GET", f"{API}/tag-survey/tags/suggest", {"params": {"prefix": rng.choice(TAGS)[:rng.randint(1, 3)]}}
+        ), 1.0),
+        ("GET /tag-survey/status/{status}", lambda rng, n: (
+            "GET", f"{API}/tag-survey/status/{rng.choice(STATUSES)}", {"params": {"limit": 20}}
+        ), 1.0),
+        ("GET /tag-survey/organizer/{organizer_email}", lambda rng, n: (
+            "GET", f"{API}/tag-survey/organizer/{rng.choice(fixture['organizers'])}", {"params": {"limit": 20}}
+        ), 1.0),
+        ("GET /tag-survey/{survey_id}", lambda rng, n: ("GET", f"{API}/tag-survey/{rng.choice(fixture['tags'])}", {}), 1.0),
+        ("PUT /tag-survey/{survey_id}", lambda rng, n: (
+            "PUT", f"{API}/tag-survey/{rng.choice(fixture['tags'])}",
+            {"json": {"status": rng.choice(STATUSES), "additional_notes": f"revision {next(counter)}"}}
+        ), 1.0),
+        ("DELETE /tag-survey/{survey_id}", lambda rng, n: (
+            "DELETE", f"{API}/tag-survey/{fixture['spare_tags'].pop()}", {}
+        ), 1.0),
+
+        ("POST /custom-survey-template/", lambda rng, n: (
+            "POST", f"{API}/custom-survey-template/", {"json": template_payload(10 ** 6 + n, args.fields)}
+        ), 1.0),
+        ("GET /custom-survey-template/", lambda rng, n: (
+            "GET", f"{API}/custom-survey-template/", {"params": {"limit": 20, "is_active": True}}
+        ), 1.0),
+        ("GET /custom-survey-template/{template_id}", lambda rng, n: (
+            "GET", f"{API}/custom-survey-template/{template(rng)[0]}", {}
+        ), 1.0),
+        ("GET /custom-survey-template/{template_id}/export", lambda rng, n: (
+            "GET", f"{API}/custom-survey-template/{template(rng)[0]}/export", {"params": {"format": "csv"}}
+        ), 0.02),
+        ("GET /custom-survey-template/{template_id}/analytics", lambda rng, n: (
+            "GET", f"{API}/custom-survey-template/{template(rng)[0]}/analytics", {}
+        ), 1.0),
+        ("GET /custom-survey-template/{template_id}/rollups", lambda rng, n: (
+            "GET", f"{API}/custom-survey-template/{template(rng)[0]}/rollups", {"params": {"day_from": day_from}}
+        ), 1.0),
+        ("PUT /custom-survey-template/{template_id}", lambda rng, n: (
+            "PUT", f"{API}/custom-survey-template/{template(rng)[0]}", {"json": {"description": f"revision {next(counter)}"}}
+        ), 1.0),
+        ("DELETE /custom-survey-template/{template_id}", lambda rng, n: (
+            "DELETE", f"{API}/custom-survey-template/{fixture['spare_templates'].pop()}", {}
+        ), 1.0),
+
+        ("POST /custom-survey-responses/", lambda rng, n: (
+            "POST", f"{API}/custom-survey-responses/", {"json": response_body(rng)}
+        ), 1.0),
+        ("POST /custom-survey-responses/batch", lambda rng, n: (
+            "POST", f"{API}/custom-survey-responses/batch", {"json": {"responses": [response_body(rng) for _ in range(args.batch_size)]}}
+        ), 0.2),
+        ("POST /custom-survey-responses/lookup", lambda rng, n: (
+            "POST", f"{API}/custom-survey-responses/lookup", {"json": {"ids": rng.sample(fixture["responses"], 20)}}
+        ), 1.0),
+        ("GET /custom-survey-responses/", lambda rng, n: (
+            "GET", f"{API}/custom-survey-responses/", {"params": {"template_id": template(rng)[0], "limit": 20}}
+        ), 1.0),
+        ("GET /custom-survey-responses/{response_id}", lambda rng, n: (
+            "GET", f"{API}/custom-survey-responses/{rng.choice(fixture['responses'])}", {}
+        ), 1.0),
+        ("PUT /custom-survey-responses/{response_id}", lambda rng, n: (
+            "PUT", f"{API}/custom-survey-responses/{rng.choice(fixture['responses'])}",
+            {"json": {"metadata": {"user_agent": "benchmark", "revision": next(counter)}}}
+        ), 1.0),
+        ("DELETE /custom-survey-responses/{response_id}", lambda rng, n: (
+            "DELETE", f"{API}/custom-survey-responses/{fixture['spare_responses'].pop()}", {}
+        ), 1.0),
+    ]
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[min(len(latencies) - 1, max(0, int(len(latencies) * fraction + 0.5) - 1))]
+
+async def drive(client: httpx.AsyncClient, factory, rng: random.Random, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    issued = 0
+
+    async def worker():
+        nonlocal errors, issued
+        while issued < total:
+            method, path, options = factory(rng, issued)
+            issued += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **options)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.isdigit() or int(status) >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+async def run_scenarios(url: str, fixture: dict, args) -> Dict[str, dict]:
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        for name, factory, share in build_scenarios(fixture, args):
+            if args.only and not any(part in name for part in args.only):
+                continue
+            rng = random.Random(f"{args.seed}:{name}")
+            total = max(1, int(args.requests * share))
+            await drive(client, factory, rng, max(1, int(args.warmup * share)), args.concurrency)
+            result = await drive(client, factory, rng, total, args.concurrency)
+            results[name] = result
+            print({"route": name, **result})
+    return results
+
+def compare(previous: dict, current: dict):
+    for name, result in current["routes"].items():
+        before = previous.get("routes", {}).get(name)
+        if not before:
+            print({"route": name, "change": "new"})
+            continue
+        print({
+            "route": name,
+            "rps": f"{before['rps']} -> {result['rps']} ({(result['rps'] / before['rps'] - 1) * 100:+.1f}%)",
+            "p50_ms": f"{before['p50_ms']} -> {result['p50_ms']}",
+            "p99_ms": f"{before['p99_ms']} -> {result['p99_ms']} ({(result['p99_ms'] / before['p99_ms'] - 1) * 100:+.1f}%)",
+        })
+
+async def main(args) -> dict:
+    mongod = dbpath = api = None
+    uri = args.mongo_uri or settings.get_mongo_uri()
+    if args.mongod:
+        mongod, uri, dbpath = start_mongod(args.mongod)
+    client = None
+    try:
+        await wait_for_mongo(uri)
+        client = AsyncMongoClient(uri)
+        pool_size = args.requests + args.warmup
+        fixture = await seed(client[args.database], args, pool_size)
+        port = free_port()
+        api = start_api(uri, args.database, port, args.workers)
+        url = f"http://127.0.0.1:{port}"
+        await wait_for_api(url, api)
+        routes = await run_scenarios(url, fixture, args)
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "python": platform.python_version(),
+                "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "mongo_uri")},
+            },
+            "routes": routes,
+        }
+    finally:
+        if api is not None:
+            stop(api)
+        if client is not None:
+            if mongod is None:
+                await client.drop_database(args.database)
+            await client.close()
+        if mongod is not None:
+            stop(mongod)
+            shutil.rmtree(dbpath, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of every survey route")
+    parser.add_argument("--mongod", help="mongod binary to start on a temporary data directory")
+    parser.add_argument("--mongo-uri", help="Use this running server instead (defaults to the MONGO_* settings)")
+    parser.add_argument("--database", default="survey_endpoint_benchmark")
+    parser.add_argument("--templates", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=12, help="Fields per template")
+    parser.add_argument("--responses", type=int, default=1000000)
+    parser.add_argument("--websites", type=int, default=10000)
+    parser.add_argument("--photos", type=int, default=20, help="Event and gallery photos per website survey")
+    parser.add_argument("--tags", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=100, help="Responses per /custom-survey-responses/batch request")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests per route before measuring")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Only routes whose name contains this text (repeatable)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be positive")
+    report = asyncio.run(main(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
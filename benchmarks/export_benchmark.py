@@ -0,0 +1,80 @@
+"""
+Throughput and memory of the streaming response export.
+
+Needs a reachable MongoDB (the MONGO_* settings). Responses are seeded into a
+scratch database that is dropped afterwards:
+
+    python -m benchmarks.export_benchmark --documents 500000 --format csv
+
+Reports rows/sec and the peak Python heap seen while draining the stream,
+which should stay flat as --documents grows.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from app.config import settings
+from app.services.custom_survey_response_service import CustomSurveyResponseService
+
+SEED_BATCH = 10000
+FIELD_COUNT = 20
+
+async def seed(db, count: int) -> dict:
+    template = {
+        "_id": ObjectId(),
+        "name": "export benchmark",
+        "survey_schema": [
+            {"field_id": f"f{index}", "title": f"Field {index}", "type": "STRING" if index % 2 else "NUMBER"}
+            for index in range(FIELD_COUNT)
+        ],
+    }
+    await db["custom_survey_templates"].insert_one(template)
+    started = datetime.utcnow()
+    for offset in range(0, count, SEED_BATCH):
+        await db["custom_survey_responses"].insert_many([
+            {
+                "template_id": str(template["_id"]),
+                "responses": {f"f{field}": ("answer" if field % 2 else field) for field in range(FIELD_COUNT)},
+                "submitted_by": "someone@example.com",
+                "submitted_at": started + timedelta(milliseconds=index),
+            }
+            for index in range(offset, min(offset + SEED_BATCH, count))
+        ], ordered=False)
+    await db["custom_survey_responses"].create_index([("template_id", 1), ("submitted_at", 1), ("_id", 1)])
+    return template
+
+async def main(count: int, export_format: str, database: str):
+    client = AsyncMongoClient(settings.get_mongo_uri())
+    db = client[database]
+    try:
+        template = await seed(db, count)
+        service = CustomSurveyResponseService(db)
+        tracemalloc.start()
+        start = time.perf_counter()
+        transferred = 0
+        async for chunk in service.export_responses(template, export_format):
+            transferred += len(chunk)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print({
+            "format": export_format,
+            "rows": count,
+            "rows_per_sec": round(count / elapsed),
+            "megabytes": round(transferred / 1e6, 1),
+            "peak_heap_mb": round(peak / 1e6, 2),
+        })
+    finally:
+        await client.drop_database(database)
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming export benchmark")
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--database", default="survey_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.documents, args.format, args.database))
@@ -0,0 +1,78 @@
+"""
+Concurrent load test against a running instance of the API.
+
+Start the service (``python main.py`` or ``docker-compose up``) and run:
+
+    python -m benchmarks.load_test --url http://localhost:8000 --requests 2000
+
+Each route is driven at increasing concurrency levels. With a non-blocking data
+layer the requests/sec figure should grow with concurrency until Mongo or the
+CPU saturates; a blocking data layer keeps it flat because every in-flight
+request waits behind the one currently talking to Mongo.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/website-survey/",
+    "/api/v1/tag-survey/",
+    "/api/v1/custom-survey-template/",
+    "/api/v1/custom-survey-responses/",
+]
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+async def main(url: str, paths: list, levels: list, total: int):
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        for path in paths:
+            baseline = None
+            for concurrency in levels:
+                result = await run_level(client, path, concurrency, total)
+                baseline = baseline or result["rps"]
+                result["scaling"] = round(result["rps"] / baseline, 2)
+                print(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for the survey API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="Comma separated concurrency levels")
+    parser.add_argument("--path", action="append", help="Route to drive (repeatable); defaults to every list route")
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.url,
+        args.path or DEFAULT_PATHS,
+        [int(level) for level in args.concurrency.split(",")],
+        args.requests,
+    ))
@@ -0,0 +1,130 @@
+"""
+CPU cost of request parsing, service-side model_dump and response validation.
+
+    python -m benchmarks.model_benchmark --output before.json
+    python -m benchmarks.model_benchmark --only website --compare before.json
+
+Covers SurveyCreate, TagSurveyCreate and CustomSurveyResponseCreate at several
+payload sizes (website surveys up to hundreds of photos, sponsors and team
+members; responses up to 200 fields). Nothing talks to MongoDB: the services
+are built on a client that is never connected, and only their in-memory steps
+are timed. Each case reports the best of --repeat timings in microseconds per
+call, so runs on the same machine are comparable across commits.
+"""
+import argparse
+import json
+import platform
+import random
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from app.models.custom_survey_response import CustomSurveyResponseCreate
+from app.models.custom_survey_template import CustomSurveyTemplateCreate
+from app.models.tag_survey import TagSurveyCreate
+from app.models.website_survey import SurveyCreate
+from app.services.custom_survey_response_service import CustomSurveyResponseService
+from app.services.response_validator import ResponseValidator
+from app.services.tag_survey_service import TagSurveyService
+from benchmarks.payloads import response_payload, tag_survey_payload, template_payload, website_survey_payload
+from benchmarks.revision import git_commit
+
+# size name -> (photos, sponsors, team members), tags per tag survey, fields per template
+SIZES = {
+    "small": ((10, 5, 5), 3, 10),
+    "medium": ((100, 50, 50), 10, 50),
+    "large": ((500, 300, 300), 20, 200),
+}
+
+Case = Tuple[str, Callable[[], object]]
+
+def website_cases(size: str, db) -> List[Case]:
+    photos, sponsors, team_members = SIZES[size][0]
+    payload = website_survey_payload(0, photos, sponsors, team_members)
+    raw = json.dumps(payload).encode()
+    survey = SurveyCreate.model_validate(payload)
+    return [
+        (f"website.parse_dict[{size}]", lambda: SurveyCreate.model_validate(payload)),
+        (f"website.parse_json[{size}]", lambda: SurveyCreate.model_validate_json(raw)),
+        (f"website.model_dump[{size}]", survey.model_dump),
+    ]
+
+def tag_cases(size: str, db) -> List[Case]:
+    payload = tag_survey_payload(0, SIZES[size][1])
+    raw = json.dumps(payload).encode()
+    survey = TagSurveyCreate.model_validate(payload)
+    service = TagSurveyService(db)
+    return [
+        (f"tag.parse_dict[{size}]", lambda: TagSurveyCreate.model_validate(payload)),
+        (f"tag.parse_json[{size}]", lambda: TagSurveyCreate.model_validate_json(raw)),
+        (f"tag.new_survey[{size}]", lambda: service._new_survey(survey)),
+    ]
+
+def response_cases(size: str, db) -> List[Case]:
+    template = CustomSurveyTemplateCreate.model_validate(template_payload(0, SIZES[size][2])).model_dump()
+    template.update(_id=ObjectId(), updated_at=datetime.utcnow())
+    payload = response_payload(str(template["_id"]), template["survey_schema"], random.Random(0))
+    raw = json.dumps(payload).encode()
+    response = CustomSurveyResponseCreate.model_validate(payload)
+    service = CustomSurveyResponseService(db)
+    assert service._validate_response(template, response.responses) == (True, None)
+    return [
+        (f"response.parse_dict[{size}]", lambda: CustomSurveyResponseCreate.model_validate(payload)),
+        (f"response.parse_json[{size}]", lambda: CustomSurveyResponseCreate.model_validate_json(raw)),
+        (f"response.model_dump[{size}]", response.model_dump),
+        (f"response.validate[{size}]", lambda: service._validate_response(template, response.responses)),
+        (f"response.compile_validator[{size}]", lambda: ResponseValidator(template["survey_schema"], template["updated_at"])),
+    ]
+
+def measure(function: Callable[[], object], repeat: int) -> dict:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return {"us_per_call": round(best / number * 1e6, 3), "calls": number}
+
+def compare(previous: dict, current: dict):
+    for name, result in current["cases"].items():
+        before = previous.get("cases", {}).get(name)
+        if not before:
+            print({"case": name, "change": "new"})
+            continue
+        print({
+            "case": name,
+            "us_per_call": f"{before['us_per_call']} -> {result['us_per_call']}",
+            "change": f"{(result['us_per_call'] / before['us_per_call'] - 1) * 100:+.1f}%",
+        })
+
+def main(sizes: List[str], only: List[str], repeat: int) -> dict:
+    db = AsyncMongoClient(connect=False)["survey_benchmark"]
+    cases: Dict[str, dict] = {}
+    for size in sizes:
+        for name, function in website_cases(size, db) + tag_cases(size, db) + response_cases(size, db):
+            if only and not any(part in name for part in only):
+                continue
+            cases[name] = measure(function, repeat)
+            print({"case": name, **cases[name]})
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "repeat": repeat,
+        },
+        "cases": cases,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model parsing, dump and validation microbenchmarks")
+    parser.add_argument("--size", action="append", choices=list(SIZES), help="Payload size (repeatable); defaults to all")
+    parser.add_argument("--only", action="append", help="Only cases whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per case; the fastest is reported")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    report = main(args.size or list(SIZES), args.only or [], args.repeat)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
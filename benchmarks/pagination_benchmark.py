@@ -0,0 +1,70 @@
+"""
+Deep-page latency of skip/limit versus keyset (cursor) pagination.
+
+Needs a reachable MongoDB (the MONGO_* settings). Documents are seeded into a
+scratch database that is dropped afterwards:
+
+    python -m benchmarks.pagination_benchmark --documents 2000000 --limit 100
+
+The skip timings grow with the page depth because Mongo walks every skipped
+document; the cursor timings stay flat because each page is an index seek on
+(submitted_at, _id).
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import AsyncMongoClient, ASCENDING
+from app.config import settings
+from app.services.pagination import encode_cursor, paginate
+from app.services.custom_survey_response_service import RESPONSE_SORT_KEYS
+
+SEED_BATCH = 10000
+
+async def seed(collection, count: int, template_id: str):
+    started = datetime.utcnow()
+    for offset in range(0, count, SEED_BATCH):
+        await collection.insert_many([
+            {
+                "template_id": template_id,
+                "responses": {"f1": "answer", "f2": index % 5},
+                "submitted_at": started + timedelta(milliseconds=index),
+            }
+            for index in range(offset, min(offset + SEED_BATCH, count))
+        ], ordered=False)
+    await collection.create_index([("template_id", ASCENDING), ("submitted_at", ASCENDING), ("_id", ASCENDING)])
+    await collection.create_index([("submitted_at", ASCENDING), ("_id", ASCENDING)])
+
+async def timed(coroutine) -> float:
+    start = time.perf_counter()
+    await coroutine
+    return round((time.perf_counter() - start) * 1000, 2)
+
+async def main(count: int, limit: int, database: str):
+    client = AsyncMongoClient(settings.get_mongo_uri())
+    db = client[database]
+    collection = db["custom_survey_responses"]
+    template_id = str(ObjectId())
+    try:
+        await seed(collection, count, template_id)
+        filter_criteria = {"template_id": template_id}
+        sort = [(key, ASCENDING) for key in RESPONSE_SORT_KEYS]
+        for fraction in (0.0, 0.25, 0.5, 0.75, 0.99):
+            depth = int(count * fraction)
+            anchor = await collection.find(filter_criteria).sort(sort).skip(max(depth - 1, 0)).limit(1).to_list(length=1)
+            cursor = encode_cursor(anchor[0], RESPONSE_SORT_KEYS) if depth else None
+            skip_ms = await timed(paginate(collection, filter_criteria, limit, skip=depth, sort_keys=RESPONSE_SORT_KEYS))
+            cursor_ms = await timed(paginate(collection, filter_criteria, limit, cursor=cursor, sort_keys=RESPONSE_SORT_KEYS))
+            print({"depth": depth, "limit": limit, "skip_ms": skip_ms, "cursor_ms": cursor_ms})
+    finally:
+        await client.drop_database(database)
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Skip versus keyset pagination benchmark")
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--database", default="survey_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.documents, args.limit, args.database))
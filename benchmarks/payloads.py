@@ -0,0 +1,116 @@
+"""
+Synthetic request payloads shared by the benchmarks.
+
+Every generator takes an index (so payloads differ) and size knobs, and
+returns plain dicts shaped like the API's create models.
+"""
+import random
+from typing import Any, Dict, List
+
+FIELD_TYPES = ["STRING", "TEXT", "NUMBER", "BOOLEAN", "DATE", "EMAIL", "OPTION", "FILE"]
+TAGS = ["music", "outdoor", "family friendly", "tech", "networking", "food", "art", "sports", "charity", "workshop",
+        "conference", "festival", "kids", "nightlife", "wellness", "film", "gaming", "fashion", "startup", "education"]
+CATEGORIES = ["Entertainment", "Business", "Education", "Sports", "Community"]
+STATUSES = ["pending", "approved", "rejected"]
+
+def template_payload(index: int, field_count: int = 12) -> Dict[str, Any]:
+    schema = []
+    for position in range(field_count):
+        field_type = FIELD_TYPES[position % len(FIELD_TYPES)]
+        field: Dict[str, Any] = {
+            "field_id": f"f{position}",
+            "title": f"Field {position}",
+            "type": field_type,
+            "required": position % 3 != 0,
+        }
+        if field_type in ("STRING", "TEXT"):
+            field["validation"] = {"min_length": 1, "max_length": 500}
+        elif field_type == "NUMBER":
+            field["validation"] = {"min_value": 0, "max_value": 10}
+        elif field_type == "OPTION":
+            field["options"] = [f"option-{n}" for n in range(8)]
+        schema.append(field)
+    return {
+        "name": f"Benchmark template {index}",
+        "description": "Generated for benchmarking",
+        "survey_schema": schema,
+        "created_by": f"owner{index % 10}@example.com",
+        "is_active": index % 5 != 0,
+    }
+
+def response_values(schema: List[dict], rng: random.Random) -> Dict[str, Any]:
+    values: Dict[str, Any] = {}
+    for field in schema:
+        field_type = field["type"]
+        if field_type in ("STRING", "TEXT"):
+            values[field["field_id"]] = "answer " * rng.randint(1, 20)
+        elif field_type == "NUMBER":
+            values[field["field_id"]] = rng.randint(0, 10)
+        elif field_type == "BOOLEAN":
+            values[field["field_id"]] = rng.random() < 0.5
+        elif field_type == "DATE":
+            values[field["field_id"]] = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        elif field_type == "EMAIL":
+            values[field["field_id"]] = f"person{rng.randint(0, 9999)}@example.com"
+        elif field_type == "OPTION":
+            values[field["field_id"]] = rng.choice(field["options"])
+        else:
+            values[field["field_id"]] = f"uploads/file-{rng.randint(0, 9999)}.pdf"
+    return values
+
+def response_payload(template_id: str, schema: List[dict], rng: random.Random) -> Dict[str, Any]:
+    return {
+        "template_id": template_id,
+        "responses": response_values(schema, rng),
+        "submitted_by": f"person{rng.randint(0, 99999)}@example.com",
+        "metadata": {"user_agent": "benchmark", "ip": "127.0.0.1"},
+    }
+
+def tag_survey_payload(index: int, tag_count: int = 4) -> Dict[str, Any]:
+    rng = random.Random(index)
+    return {
+        "event_name": f"Event {index}",
+        "event_date": "2024-06-01",
+        "event_location": f"Hall {index % 50}, Lagos",
+        "event_description": "An event generated for benchmarking " * 3,
+        "requested_tags": rng.sample(TAGS, min(tag_count, len(TAGS))),
+        "tag_category": CATEGORIES[index % len(CATEGORIES)],
+        "reason_for_tags": "Discoverability",
+        "organizer_name": f"Organizer {index % 200}",
+        "organizer_email": f"organizer{index % 200}@example.com",
+        "organization_name": f"Organization {index % 300}",
+        "expected_attendees": 100 + index % 5000,
+    }
+
+def website_survey_payload(index: int, photos: int = 20, sponsors: int = 10, team_members: int = 12) -> Dict[str, Any]:
+    return {
+        "general_info": {
+            "organization_name": f"Organization {index}",
+            "event_name": f"Event {index}",
+            "event_date": "2024-06-01",
+            "event_location": f"Hall {index % 50}, Lagos",
+            "organization_email": f"contact{index}@example.com",
+            "organization_social_media": {"x": "@org", "instagram": "@org"},
+            "event_type": "Conference",
+            "event_attendees": 1500,
+        },
+        "branding": {"brand_colors": "#000000,#ffffff", "theme_mode": "dark", "organization_logo": f"uploads/logo-{index}.png"},
+        "web_structure": {"required_pages": "home,about,tickets", "has_navigation": True, "primary_cta": "Buy tickets"},
+        "web_content": {
+            "motto_tagline": "Together we build",
+            "homepage_description": "A long homepage description " * 5,
+            "past_events": [f"Past event {n}" for n in range(5)],
+            "event_photos": [f"uploads/photo-{n}.jpg" for n in range(photos)],
+            "show_sponsors": sponsors > 0,
+            "sponsors": [{"name": f"Sponsor {n}", "logo": f"uploads/sponsor-{n}.png"} for n in range(sponsors)],
+        },
+        "ticketing": {"sales_method": "embedded", "has_ticketing": True, "ticket_type": ["VIP", "Regular"], "ticket_price_range": [10.0, 250.0]},
+        "about": {
+            "organization_story": "Our story " * 20,
+            "show_team": team_members > 0,
+            "team_members": [{"name": f"Member {n}", "role": "Crew", "image": f"uploads/team-{n}.jpg"} for n in range(team_members)],
+        },
+        "gallery": {"photos": [{"title": f"Photo {n}", "url": f"uploads/gallery-{n}.jpg"} for n in range(photos)]},
+        "faq": {"questions": [{"question": f"Question {n}?", "answer": "Answer"} for n in range(8)]},
+        "domain": {"has_domain": True, "domain_name": "example.com"},
+    }
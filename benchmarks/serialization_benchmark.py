@@ -0,0 +1,79 @@
+"""
+List-page serialization: the previous path versus MongoJSONResponse.
+
+    python -m benchmarks.serialization_benchmark --documents 100 --iterations 200
+
+The previous path stringified every ``_id`` in the service, ran FastAPI's
+jsonable_encoder over the page and rendered it with the stdlib json module.
+MongoJSONResponse hands the raw documents (ObjectId, datetime and all) to orjson.
+"""
+import argparse
+import timeit
+from datetime import datetime
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.routes.responses import MongoJSONResponse
+
+def website_document(index: int, photos: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "general_info": {
+            "organization_name": f"Organization {index}",
+            "event_name": f"Event {index}",
+            "event_date": "2024-06-01",
+            "organization_email": f"contact{index}@example.com",
+            "organization_social_media": {"x": "@org", "instagram": "@org"},
+            "event_attendees": 1500,
+        },
+        "branding": {"brand_colors": "#000000,#ffffff", "theme_mode": "dark", "organization_logo": "uploads/logo.png"},
+        "web_structure": {"required_pages": "home,about,tickets", "has_navigation": True, "primary_cta": "Buy tickets"},
+        "web_content": {
+            "motto_tagline": "Together we build",
+            "homepage_description": "A long homepage description " * 5,
+            "past_events": [f"Past event {n}" for n in range(5)],
+            "event_photos": [f"uploads/photo-{n}.jpg" for n in range(photos)],
+            "sponsors": [{"name": f"Sponsor {n}", "logo": f"uploads/sponsor-{n}.png"} for n in range(10)],
+        },
+        "ticketing": {"sales_method": "embedded", "has_ticketing": True, "ticket_type": ["VIP", "Regular"], "ticket_price_range": [10.0, 250.0]},
+        "about": {
+            "organization_story": "Our story " * 20,
+            "team_members": [{"name": f"Member {n}", "role": "Crew", "image": f"uploads/team-{n}.jpg"} for n in range(12)],
+        },
+        "gallery": {"photos": [{"title": f"Photo {n}", "url": f"uploads/gallery-{n}.jpg"} for n in range(photos)]},
+        "faq": {"questions": [{"question": f"Question {n}?", "answer": "Answer"} for n in range(8)]},
+        "domain": {"has_domain": True, "domain_name": "example.com"},
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+def previous_path(documents: list) -> bytes:
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    content = {"total": len(documents), "skip": 0, "limit": len(documents), "surveys": documents}
+    return JSONResponse(jsonable_encoder(content)).body
+
+def current_path(documents: list) -> bytes:
+    content = {"total": len(documents), "skip": 0, "limit": len(documents), "surveys": documents}
+    return MongoJSONResponse(content).body
+
+def main(count: int, photos: int, iterations: int):
+    page = [website_document(index, photos) for index in range(count)]
+    previous = timeit.timeit(lambda: previous_path([dict(document) for document in page]), number=iterations)
+    current = timeit.timeit(lambda: current_path([dict(document) for document in page]), number=iterations)
+    print({
+        "documents": count,
+        "photos_per_document": photos,
+        "payload_kb": round(len(current_path(page)) / 1024, 1),
+        "previous_ms_per_page": round(previous / iterations * 1000, 3),
+        "current_ms_per_page": round(current / iterations * 1000, 3),
+        "speedup": round(previous / current, 2),
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List-page serialization benchmark")
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+    main(args.documents, args.photos, args.iterations)
@@ -0,0 +1,115 @@
+"""
+Microbenchmark of response validation for a wide template.
+
+    python -m benchmarks.validator_benchmark --fields 80 --iterations 20000
+
+Compares the compiled, cached ResponseValidator against the schema-walking
+implementation it replaced (kept below as ``legacy_validate_response``).
+"""
+import argparse
+import timeit
+from datetime import datetime
+from bson import ObjectId
+from app.services.response_validator import get_validator
+
+FIELD_TYPES = ["STRING", "TEXT", "NUMBER", "BOOLEAN", "DATE", "EMAIL", "OPTION", "FILE"]
+
+def legacy_validate_response(template: dict, responses: dict):
+    schema = template.get("survey_schema", [])
+    for field in schema:
+        field_id = field.get("field_id")
+        is_required = field.get("required", True)
+        if is_required and field_id not in responses:
+            return False, f"Required field '{field.get('title', field_id)}' is missing"
+    for field_id, value in responses.items():
+        field_def = next((f for f in schema if f.get("field_id") == field_id), None)
+        if not field_def:
+            return False, f"Unknown field '{field_id}' not in template schema"
+        field_type = field_def.get("type")
+        field_title = field_def.get("title", field_id)
+        if value is None and not field_def.get("required", True):
+            continue
+        validation = field_def.get("validation", {})
+        if field_type in ("STRING", "TEXT"):
+            if not isinstance(value, str):
+                return False, f"Field '{field_title}' must be a string"
+            if validation:
+                if "min_length" in validation and len(value) < validation["min_length"]:
+                    return False, f"Field '{field_title}' must be at least {validation['min_length']} characters"
+                if "max_length" in validation and len(value) > validation["max_length"]:
+                    return False, f"Field '{field_title}' must be at most {validation['max_length']} characters"
+        elif field_type == "NUMBER":
+            if not isinstance(value, (int, float)):
+                return False, f"Field '{field_title}' must be a number"
+            if validation:
+                if "min_value" in validation and value < validation["min_value"]:
+                    return False, f"Field '{field_title}' must be at least {validation['min_value']}"
+                if "max_value" in validation and value > validation["max_value"]:
+                    return False, f"Field '{field_title}' must be at most {validation['max_value']}"
+        elif field_type == "BOOLEAN":
+            if not isinstance(value, bool):
+                return False, f"Field '{field_title}' must be a boolean (true/false)"
+        elif field_type == "DATE":
+            if not isinstance(value, str):
+                return False, f"Field '{field_title}' must be a date string (YYYY-MM-DD)"
+        elif field_type == "EMAIL":
+            if not isinstance(value, str):
+                return False, f"Field '{field_title}' must be a string"
+            if "@" not in value or "." not in value:
+                return False, f"Field '{field_title}' must be a valid email address"
+        elif field_type == "OPTION":
+            options = field_def.get("options", [])
+            if value not in options:
+                return False, f"Field '{field_title}' must be one of: {', '.join(options)}"
+        elif field_type == "FILE":
+            if not isinstance(value, str):
+                return False, f"Field '{field_title}' must be a file path string"
+    return True, None
+
+def build_template(field_count: int) -> tuple:
+    schema = []
+    responses = {}
+    for index in range(field_count):
+        field_type = FIELD_TYPES[index % len(FIELD_TYPES)]
+        field = {"field_id": f"f{index}", "title": f"Field {index}", "type": field_type, "required": index % 3 != 0}
+        if field_type in ("STRING", "TEXT"):
+            field["validation"] = {"min_length": 1, "max_length": 200}
+            responses[field["field_id"]] = "some answer text"
+        elif field_type == "NUMBER":
+            field["validation"] = {"min_value": 0, "max_value": 10}
+            responses[field["field_id"]] = 7
+        elif field_type == "BOOLEAN":
+            responses[field["field_id"]] = True
+        elif field_type == "DATE":
+            responses[field["field_id"]] = "2024-02-12"
+        elif field_type == "EMAIL":
+            responses[field["field_id"]] = "someone@example.com"
+        elif field_type == "OPTION":
+            field["options"] = [f"option-{n}" for n in range(12)]
+            responses[field["field_id"]] = "option-11"
+        else:
+            responses[field["field_id"]] = "uploads/file.pdf"
+        schema.append(field)
+    template = {"_id": ObjectId(), "survey_schema": schema, "updated_at": datetime.utcnow()}
+    return template, responses
+
+def main(field_count: int, iterations: int):
+    template, responses = build_template(field_count)
+    assert legacy_validate_response(template, responses) == (True, None)
+    assert get_validator(template).validate(responses) == (True, None)
+    legacy = timeit.timeit(lambda: legacy_validate_response(template, responses), number=iterations)
+    compiled = timeit.timeit(lambda: get_validator(template).validate(responses), number=iterations)
+    print({
+        "fields": field_count,
+        "iterations": iterations,
+        "legacy_us_per_call": round(legacy / iterations * 1e6, 2),
+        "compiled_us_per_call": round(compiled / iterations * 1e6, 2),
+        "speedup": round(legacy / compiled, 2),
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Response validator microbenchmark")
+    parser.add_argument("--fields", type=int, default=80)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.fields, args.iterations)
@@ -1,11 +1,27 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import settings
 from app.database.connection import MongoDBConnection
+from app.database.indexes import ensure_indexes
+from app.routes.metrics import MetricsMiddleware, track_route, router as metrics_router
+from app.routes.profiling import ProfilingMiddleware, profiling_enabled, router as profiling_router
+from app.routes.responses import MongoJSONResponse
+from app.services.custom_survey_template_service import run_response_count_reconciliation
+from app.services.image_derivative_service import ImageDerivativeService, shutdown_derivatives
+from app.services.ingestion_queue import start_queue, drain_queues, queue_stats
+from app.services.tag_count_service import tag_index
+from app.services.tag_survey_service import TagSurveyService
+from app.services.upload_service import run_multipart_sweep
+from app.services.custom_survey_response_service import CustomSurveyResponseService
+from app.services.template_cache import template_cache
 from app.routes import (
     website_survey_router,
     tag_survey_router,
     custom_survey_template_router,
-    custom_survey_response_router
+    custom_survey_response_router,
+    upload_router,
+    search_router
 )
 
 app = FastAPI(
@@ -14,6 +30,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=MongoJSONResponse,
+    dependencies=[Depends(track_route)],
 )
 
 app.add_middleware(
@@ -22,16 +40,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
+app.add_middleware(MetricsMiddleware)
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+background_tasks = []
 
 @app.on_event("startup")
 async def startup_event():
     MongoDBConnection.connect()
+    if settings.ENSURE_INDEXES_ON_STARTUP:
+        await ensure_indexes(MongoDBConnection.get_database())
+    if settings.RESPONSE_COUNT_RECONCILE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_response_count_reconciliation(
+            MongoDBConnection.get_database(),
+            settings.RESPONSE_COUNT_RECONCILE_INTERVAL_SECONDS
+        )))
+    if settings.UPLOAD_SWEEP_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_multipart_sweep(
+            MongoDBConnection.get_database(),
+            settings.UPLOAD_SWEEP_INTERVAL_SECONDS
+        )))
+    if settings.ASYNC_INGESTION:
+        db = MongoDBConnection.get_database()
+        start_queue("event_tags_surveys", TagSurveyService(db).write_surveys)
+        start_queue("custom_survey_responses", CustomSurveyResponseService(db).write_responses)
+    if settings.IMAGE_DERIVATIVES_ENABLED:
+        await ImageDerivativeService(MongoDBConnection.get_database()).resume()
     print("Survey Microservices started successfully.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    MongoDBConnection.close()
+    await drain_queues()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await shutdown_derivatives()
+    await MongoDBConnection.close()
     print("Survey Microservices stopped successfully.")
 
 @app.get("/", tags=["Health"])
@@ -47,13 +95,20 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "database": "connected"
+        "database": "connected",
+        "template_cache": template_cache.stats(),
+        "ingestion": queue_stats(),
+        "tag_index": tag_index.stats(),
     }
 
+app.include_router(metrics_router)
+app.include_router(profiling_router)
 app.include_router(website_survey_router, prefix="/api/v1")
 app.include_router(tag_survey_router, prefix="/api/v1")
 app.include_router(custom_survey_template_router, prefix="/api/v1")
 app.include_router(custom_survey_response_router, prefix="/api/v1")
+app.include_router(upload_router, prefix="/api/v1")
+app.include_router(search_router, prefix="/api/v1")
 
 if __name__ == "__main__":
     import uvicorn